@@ -1,18 +1,98 @@
+import asyncio
 import os
-from io import BytesIO
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 from urllib.parse import quote
 import time
+import random
 import pathlib
 import base64
+import hashlib
 import shutil
 import zipfile
 from importlib import resources
 
+try:
+    import orjson
+except ImportError:  # optional, installed with the "fast" extra
+    orjson = None
+
 from ib_cicd.certificates import with_instabase_certificate
 
 
+def create_session(pool_connections=8, pool_maxsize=16, max_retries=0):
+    """
+    Creates a requests session backed by a pooled adapter so connections are kept alive across calls
+
+    Args:
+        pool_connections (int): number of host connection pools to cache
+        pool_maxsize (int): maximum number of connections kept per pool
+        max_retries (int | urllib3.util.Retry): retry policy passed to the adapter
+
+    Returns:
+        requests.Session: session with the adapter mounted for http and https
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=max_retries,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Server-side retry policy sent with metadata requests
+_RETRY_HEADER = json.dumps({"retries": 2, "backoff-seconds": 1})
+
+# File contents read through the API keyed by (host, path, token digest), stored as
+# (etag, content) so unchanged files are served from memory after a 304
+_FILE_CONTENT_CACHE = {}
+# Larger files, such as solution packages, are not kept in memory
+_FILE_CONTENT_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# Job status responses worth polling again rather than failing on
+_RECOVERABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# Shared by every helper below so repeated calls reuse TCP/TLS connections. Gateway
+# errors are retried by the adapter; once retries run out the last response is
+# returned so each helper still reports the failure with its own message.
+_SESSION = create_session(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[502, 503, 504],
+        raise_on_status=False,
+    ),
+)
+
+
+def _tls_verify():
+    """Session verify setting: the IB_CA_BUNDLE path or True, False only on opt-out."""
+    if os.environ.get("IB_SKIP_TLS_VERIFY", "").lower() in ("1", "true", "yes"):
+        return False
+    return os.environ.get("IB_CA_BUNDLE", True)
+
+
+# Certificate verification is configured once on the session instead of per call, so
+# every helper shares one connection pool. TLS is verified by default; set IB_CA_BUNDLE
+# to a CA bundle path for hosts with a private CA, or explicitly opt out for
+# self-signed hosts with IB_SKIP_TLS_VERIFY=1.
+_SESSION.verify = _tls_verify()
+
+
+def _dumps(obj):
+    """Encode a request body as JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
 def __get_file_api_root(ib_host, api_version="v2", add_files_suffix=True):
     """
     Gets file api root from an ib host url
@@ -46,7 +126,7 @@ def download_regression_suite(
     url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/zipball/{branch}"
     headers = {"Authorization": f"token {token}", "Cache-Control": "no-cache"}
 
-    response = requests.get(url, headers=headers, stream=True, proxies=proxies)
+    response = _SESSION.get(url, headers=headers, stream=True, proxies=proxies)
     response.raise_for_status()
 
     original_zip_path = "original_regression_suite.zip"
@@ -79,45 +159,44 @@ def download_regression_suite(
     return renamed_zip_path
 
 
-def upload_chunks(ib_host, path, api_token, file_data, proxies=None):
+def upload_chunks(
+    ib_host, path, api_token, file_data, proxies=None, chunk_size=10485760
+):
     """
     Uploads bytes to a location on the Instabase environment in chunks
 
+    The first chunk starts the file (IB-Cursor 0) and each following chunk is
+    appended (IB-Cursor -1), so chunks are sent in order.
+
     Args:
         ib_host (str): IB host url
         path (str): path on IB environment to upload to
         api_token (str): API token for IB environment
         file_data (bytes): Data to upload
+        chunk_size (int): Maximum number of bytes sent per request
 
     Returns:
         Response object
     """
-    part_size = 10485760
     file_api_root = __get_file_api_root(ib_host)
     append_root_url = os.path.join(file_api_root, path)
-    headers = with_instabase_certificate(
-        {
-            "Authorization": f"Bearer {api_token}",
-        }
-    )
-
-    bytes_io_content = BytesIO(file_data)
-    with bytes_io_content as f:
-        part_num = 0
-        for chunk in iter(lambda: f.read(part_size), b""):
-            headers = with_instabase_certificate(headers)
-            headers["IB-Cursor"] = "0" if part_num == 0 else "-1"
-            resp = requests.patch(
-                append_root_url,
-                headers=headers,
-                data=chunk,
-                verify=False,
-                proxies=proxies,
-            )
-            part_num += 1
-
-    if resp.status_code != 204:
-        raise Exception(f"Upload failed: {resp.content}")
+    headers = with_instabase_certificate({"Authorization": f"Bearer {api_token}"})
+    first_headers = {**headers, "IB-Cursor": "0"}
+    append_headers = {**headers, "IB-Cursor": "-1"}
+
+    # Slicing a memoryview hands each chunk to the session without copying it
+    data = memoryview(file_data)
+    # An empty upload still sends one request so the file is created
+    offsets = range(0, len(data), chunk_size) or [0]
+    for offset in offsets:
+        resp = _SESSION.patch(
+            append_root_url,
+            headers=first_headers if offset == 0 else append_headers,
+            data=data[offset : offset + chunk_size],
+            proxies=proxies,
+        )
+        if resp.status_code != 204:
+            raise Exception(f"Upload failed: {resp.content}")
     return resp
 
 
@@ -129,7 +208,7 @@ def upload_file(ib_host, api_token, file_path, file_data, proxies=None):
         ib_host (str): IB host url
         api_token (str): API token for IB environment
         file_path (str): path on IB environment to upload to
-        file_data (bytes): Data to upload
+        file_data (bytes | file object): Data to upload, file objects are streamed
 
     Returns:
         Response object
@@ -138,9 +217,7 @@ def upload_file(ib_host, api_token, file_path, file_data, proxies=None):
     url = os.path.join(file_api_root, file_path)
     headers = with_instabase_certificate({"Authorization": f"Bearer {api_token}"})
 
-    resp = requests.put(
-        url, headers=headers, data=file_data, verify=False, proxies=proxies
-    )
+    resp = _SESSION.put(url, headers=headers, data=file_data, proxies=proxies)
 
     if resp.status_code != 204:
         raise Exception(f"Upload file failed: {resp.content}")
@@ -148,7 +225,9 @@ def upload_file(ib_host, api_token, file_path, file_data, proxies=None):
     return resp
 
 
-def read_file_through_api(ib_host, api_token, path_to_file, proxies=None):
+def read_file_through_api(
+    ib_host, api_token, path_to_file, proxies=None, stream=False, if_none_match=None
+):
     """
     Read file from IB environment
 
@@ -156,6 +235,8 @@ def read_file_through_api(ib_host, api_token, path_to_file, proxies=None):
         ib_host (str): IB host url
         api_token (str): API token for IB environment
         path_to_file (str): path to file on IB environment
+        stream (bool): defer downloading the body so it can be read with iter_content
+        if_none_match (str): ETag of a cached copy; a 304 response is returned if unchanged
 
     Returns:
         Response object
@@ -165,12 +246,18 @@ def read_file_through_api(ib_host, api_token, path_to_file, proxies=None):
 
     params = {"expect-node-type": "file"}
     headers = with_instabase_certificate({"Authorization": f"Bearer {api_token}"})
+    if if_none_match:
+        headers["If-None-Match"] = if_none_match
 
-    resp = requests.get(
-        url, headers=headers, params=params, verify=False, proxies=proxies
+    resp = _SESSION.get(
+        url,
+        headers=headers,
+        params=params,
+        proxies=proxies,
+        stream=stream,
     )
 
-    if resp.status_code != 200:
+    if resp.status_code != 200 and not (if_none_match and resp.status_code == 304):
         raise Exception(f"Error reading file: {resp.content}, for url: {url}")
 
     return resp
@@ -193,11 +280,9 @@ def publish_to_marketplace(ib_host, api_token, ibsolution_path, proxies=None):
     url = f"{file_api_v1}/marketplace/publish"
 
     args = {"ibsolution_path": ibsolution_path}
-    json_data = json.dumps(args)
+    json_data = _dumps(args)
 
-    resp = requests.post(
-        url, headers=headers, data=json_data, verify=False, proxies=proxies
-    )
+    resp = _SESSION.post(url, headers=headers, data=json_data, proxies=proxies)
     try:
         resp_json = resp.json()
         print(f"File: {url}, Solution publish status: {resp_json}")
@@ -212,7 +297,7 @@ def publish_to_marketplace(ib_host, api_token, ibsolution_path, proxies=None):
 
 
 def make_api_request(
-    url, api_token, method="get", payload=None, context=None, verify=True, proxies=None
+    url, api_token, method="get", payload=None, context=None, verify=None, proxies=None
 ):
     """
     Makes an API request with common error handling and logging.  Raises an exception on failure.
@@ -223,7 +308,7 @@ def make_api_request(
         method (str): HTTP method (get/post)
         payload (dict): Request payload for POST
         context (str): Context header value
-        verify (bool): Verify SSL
+        verify (bool | str): Verify SSL, None to use the session's TLS setting
 
     Returns:
         dict: Response JSON on success
@@ -242,25 +327,25 @@ def make_api_request(
 
     try:
         if method == "get":
-            response = requests.get(
+            response = _SESSION.get(
                 url,
                 headers=headers,
                 verify=verify,
                 proxies=proxies,
             )
         elif method == "patch":
-            response = requests.patch(
+            response = _SESSION.patch(
                 url,
                 headers=headers,
-                data=json.dumps(payload),
+                data=_dumps(payload),
                 verify=verify,
                 proxies=proxies,
             )
         else:
-            response = requests.post(
+            response = _SESSION.post(
                 url,
                 headers=headers,
-                data=json.dumps(payload),
+                data=_dumps(payload),
                 verify=verify,
                 proxies=proxies,
             )
@@ -273,6 +358,38 @@ def make_api_request(
         raise
 
 
+async def make_api_request_async(
+    url, api_token, method="get", payload=None, context=None, verify=None, proxies=None
+):
+    """
+    Awaitable version of make_api_request for issuing many IB calls concurrently
+
+    The request runs on a worker thread over the shared session, so calls gathered
+    on one event loop share its connection pool.
+
+    Args:
+        url (str): Request URL
+        api_token (str): API token
+        method (str): HTTP method (get/post/patch)
+        payload (dict): Request payload for POST and PATCH
+        context (str): Context header value
+        verify (bool | str): Verify SSL, None to use the session's TLS setting
+
+    Returns:
+        dict: Response JSON on success
+    """
+    return await asyncio.to_thread(
+        make_api_request,
+        url,
+        api_token,
+        method=method,
+        payload=payload,
+        context=context,
+        verify=verify,
+        proxies=proxies,
+    )
+
+
 def publish_advanced_app(target_url, api_token, payload, context, proxies=None):
     """Publish an advanced app"""
     url = f"{target_url}/api/v2/zero-shot-idp/projects/advanced-app"
@@ -319,6 +436,13 @@ def create_deployment(
         )
 
 
+def _get_job_status(ib_host, job_id, job_type, api_token, proxies=None):
+    """Send the job status request without interpreting the response."""
+    url = f"{ib_host}/api/v1/jobs/status?job_id={job_id}&type={job_type}"
+    headers = with_instabase_certificate({"Authorization": f"Bearer {api_token}"})
+    return _SESSION.get(url, headers=headers, proxies=proxies)
+
+
 def check_job_status(ib_host, job_id, job_type, api_token, proxies=None):
     """
     Check status of a job using Job Status API
@@ -332,10 +456,7 @@ def check_job_status(ib_host, job_id, job_type, api_token, proxies=None):
     Returns:
         Response object
     """
-    url = f"{ib_host}/api/v1/jobs/status?job_id={job_id}&type={job_type}"
-    headers = with_instabase_certificate({"Authorization": f"Bearer {api_token}"})
-
-    resp = requests.get(url, headers=headers, verify=False, proxies=proxies)
+    resp = _get_job_status(ib_host, job_id, job_type, api_token, proxies=proxies)
     content = json.loads(resp.content)
 
     if resp.status_code != 200 or (
@@ -364,7 +485,7 @@ def check_job_status_build(target_url, api_token, job_id, proxies=None):
 
     for _ in range(15):
         try:
-            response = requests.get(url, headers=headers, verify=True, proxies=proxies)
+            response = _SESSION.get(url, headers=headers, proxies=proxies)
             response.raise_for_status()
             job_data = response.json()
             state = job_data.get("state", "UNKNOWN")
@@ -406,9 +527,9 @@ def unzip_files(ib_host, api_token, zip_path, destination_path=None, proxies=Non
     destination_path = destination_path or ".".join(zip_path.split(".")[:-1])
 
     headers = with_instabase_certificate({"Authorization": f"Bearer {api_token}"})
-    data = json.dumps({"src_path": zip_path, "dst_path": destination_path})
+    data = _dumps({"src_path": zip_path, "dst_path": destination_path})
 
-    resp = requests.post(url, headers=headers, data=data, verify=False, proxies=proxies)
+    resp = _SESSION.post(url, headers=headers, data=data, proxies=proxies)
 
     if resp.status_code != 202:
         raise Exception(f"Unable to unzip files: {resp.content}")
@@ -459,7 +580,7 @@ def compile_solution(
         flow_path = relative_flow_path.split("/")[-1]
 
     headers = {"Authorization": "Bearer {0}".format(api_token)}
-    data = json.dumps(
+    data = _dumps(
         {
             "binary_type": "Single Flow",
             "flow_project_root": flow_project_root,
@@ -470,11 +591,10 @@ def compile_solution(
             },
         }
     )
-    resp = requests.post(
+    resp = _SESSION.post(
         url.replace("//d", "/d"),
         headers=headers,
         data=data,
-        verify=False,
         proxies=proxies,
     )
 
@@ -521,12 +641,10 @@ def copy_file_within_ib(
     else:
         file_api_root = __get_file_api_root(ib_host)
         url = os.path.join(file_api_root, "copy")
-        headers = {"Authorization": f"Bearer {api_token}"}
-        data = json.dumps({"src_path": source_path, "dst_path": destination_path})
+        headers = with_instabase_certificate({"Authorization": f"Bearer {api_token}"})
+        data = _dumps({"src_path": source_path, "dst_path": destination_path})
 
-        resp = requests.post(
-            url, headers=headers, data=data, verify=False, proxies=proxies
-        )
+        resp = _SESSION.post(url, headers=headers, data=data, proxies=proxies)
 
         if resp.status_code != 202:
             raise Exception(f"Error copying file: {resp.content}")
@@ -550,10 +668,27 @@ def read_file_content_from_ib(
         bytes: File content
     """
     if not use_clients:
+        token_digest = hashlib.blake2b(api_token.encode(), digest_size=8).hexdigest()
+        cache_key = (ib_host, file_path_to_read, token_digest)
+        etag, cached_content = _FILE_CONTENT_CACHE.get(cache_key, (None, None))
+
         resp = read_file_through_api(
-            ib_host, api_token, file_path_to_read, proxies=proxies
+            ib_host,
+            api_token,
+            file_path_to_read,
+            proxies=proxies,
+            if_none_match=etag,
         )
-        return resp.content
+        if resp.status_code == 304:
+            return cached_content
+
+        content = resp.content
+        etag = resp.headers.get("ETag")
+        if etag and len(content) <= _FILE_CONTENT_CACHE_MAX_BYTES:
+            _FILE_CONTENT_CACHE[cache_key] = (etag, content)
+        else:
+            _FILE_CONTENT_CACHE.pop(cache_key, None)
+        return content
     else:
         clients, err = kwargs["_FN_CONTEXT_KEY"].get_by_col_name("CLIENTS")
         if clients.ibfile.is_file(file_path_to_read):
@@ -567,6 +702,11 @@ def read_file_content_from_ib(
             raise Exception(f"Not valid file: {file_path_to_read}")
 
 
+def clear_file_content_cache():
+    """Forget file contents remembered by read_file_content_from_ib."""
+    _FILE_CONTENT_CACHE.clear()
+
+
 def get_file_metadata(ib_host, api_token, file_path, proxies=None):
     """
     Get metadata of file using file API
@@ -585,11 +725,11 @@ def get_file_metadata(ib_host, api_token, file_path, proxies=None):
     headers = with_instabase_certificate(
         {
             "Authorization": f"Bearer {api_token}",
-            "IB-Retry-Config": json.dumps({"retries": 2, "backoff-seconds": 1}),
+            "IB-Retry-Config": _RETRY_HEADER,
         }
     )
 
-    return requests.head(url, headers=headers, proxies=proxies)
+    return _SESSION.head(url, headers=headers, proxies=proxies)
 
 
 def create_folder_if_it_does_not_exists(ib_host, api_token, folder_path, proxies=None):
@@ -608,21 +748,20 @@ def create_folder_if_it_does_not_exists(ib_host, api_token, folder_path, proxies
     metadata_url = os.path.join(file_api_root, folder_path)
     headers = with_instabase_certificate({"Authorization": f"Bearer {api_token}"})
 
-    r = requests.head(metadata_url, headers=headers, verify=False, proxies=proxies)
+    r = _SESSION.head(metadata_url, headers=headers, proxies=proxies)
     if r.status_code == 404:
         create_url = os.path.dirname(metadata_url)
         folder_name = os.path.basename(folder_path)
-        data = json.dumps({"name": folder_name, "node_type": "folder"})
-        return requests.post(
+        data = _dumps({"name": folder_name, "node_type": "folder"})
+        return _SESSION.post(
             create_url,
             headers=with_instabase_certificate(headers),
             data=data,
-            verify=False,
             proxies=proxies,
         )
 
 
-def list_directory(ib_host, folder, api_token, proxies=None):
+def list_directory(ib_host, folder, api_token, proxies=None, page_size=None):
     """
     Lists directory on IB filesystem and returns full paths
 
@@ -630,6 +769,7 @@ def list_directory(ib_host, folder, api_token, proxies=None):
         ib_host (str): IB host url
         folder (str): Folder to list
         api_token (str): API token
+        page_size (int): Nodes requested per page, server default if None
 
     Returns:
         list: List of paths in directory
@@ -637,19 +777,15 @@ def list_directory(ib_host, folder, api_token, proxies=None):
     file_api_root = __get_file_api_root(ib_host)
     url = os.path.join(file_api_root, folder)
     headers = with_instabase_certificate({"Authorization": f"Bearer {api_token}"})
+    params = {"expect-node-type": "folder", "start-token": None}
+    if page_size is not None:
+        params["page-size"] = page_size
 
     paths = []
     has_more = None
-    start_token = None
 
     while has_more is not False:
-        params = {"expect-node-type": "folder", "start-token": start_token}
-        resp = requests.get(
-            url,
-            headers=with_instabase_certificate(headers),
-            params=params,
-            proxies=proxies,
-        )
+        resp = _SESSION.get(url, headers=headers, params=params, proxies=proxies)
 
         content = json.loads(resp.content)
         if resp.status_code != 200 or (
@@ -657,44 +793,130 @@ def list_directory(ib_host, folder, api_token, proxies=None):
         ):
             raise Exception(f"Error checking job status: {resp.content}")
 
-        paths.extend([node["full_path"] for node in content["nodes"]])
+        paths.extend(node["full_path"] for node in content["nodes"])
         has_more = content["has_more"]
-        start_token = content["next_page_token"]
+        params = {**params, "start-token": content["next_page_token"]}
 
     return paths
 
 
-def wait_until_job_finishes(ib_host, job_id, job_type, api_token, proxies=None):
+def wait_until_job_finishes(
+    ib_host,
+    job_id,
+    job_type,
+    api_token,
+    proxies=None,
+    *,
+    base_delay=1.0,
+    max_delay=30.0,
+    jitter=0.5,
+    deadline=None,
+    max_recoverable_failures=10,
+):
     """
     Wait until job finishes using job status API
 
+    Polls with exponential backoff and jitter: the n-th wait is
+    min(max_delay, base_delay * 2**n) stretched by up to jitter. Rate-limited
+    and gateway error responses are retried on the same schedule, up to
+    max_recoverable_failures in a row.
+
     Args:
         ib_host (str): IB host url
         job_id (str): Job ID
         job_type (str): Job type
         api_token (str): API token
+        base_delay (float): Delay in seconds before the first re-poll
+        max_delay (float): Upper bound in seconds for the un-jittered delay
+        jitter (float): Maximum fraction added to each delay
+        deadline (float): Maximum number of seconds to wait, None to wait forever
+        max_recoverable_failures (int): Consecutive rate-limited or gateway error
+            responses tolerated before giving up
 
     Returns:
         bool: True if completed successfully
     """
+    stop_at = None if deadline is None else time.monotonic() + deadline
+    attempt = 0
+    recoverable_failures = 0
     while True:
-        job_status_response = check_job_status(
+        job_status_response = _get_job_status(
             ib_host, job_id, job_type, api_token, proxies=proxies
         )
-        content = json.loads(job_status_response.content)
 
-        if content["status"] != "OK":
-            raise Exception(f"Job failed: {content}")
+        if job_status_response.status_code in _RECOVERABLE_STATUS_CODES:
+            recoverable_failures += 1
+            if recoverable_failures >= max_recoverable_failures:
+                raise Exception(
+                    f"Error checking job status: {job_status_response.content}"
+                )
+        else:
+            recoverable_failures = 0
+            content = json.loads(job_status_response.content)
+            if (
+                job_status_response.status_code != 200
+                or content.get("status") == "ERROR"
+            ):
+                raise Exception(
+                    f"Error checking job status: {job_status_response.content}"
+                )
+            if content["status"] != "OK":
+                raise Exception(f"Job failed: {content}")
 
-        state = content["state"]
-        if state in ["DONE", "COMPLETE"]:
-            results_status = all(
-                result["status"] == "OK" for result in content.get("results", [])
-            )
-            if not results_status:
-                raise Exception(f"Job completed with errors: {content}")
-            return content
-        time.sleep(5)
+            state = content["state"]
+            if state in ["DONE", "COMPLETE"]:
+                results_status = all(
+                    result["status"] == "OK" for result in content.get("results", [])
+                )
+                if not results_status:
+                    raise Exception(f"Job completed with errors: {content}")
+                return content
+
+        delay = min(max_delay, base_delay * 2**attempt)
+        delay *= 1 + random.uniform(0, jitter)
+        if stop_at is not None:
+            remaining = stop_at - time.monotonic()
+            if remaining <= 0:
+                raise Exception(
+                    f"Timed out waiting for job {job_id} after {deadline} seconds"
+                )
+            delay = min(delay, remaining)
+        time.sleep(delay)
+        attempt += 1
+
+
+def wait_for_completion(
+    ib_host, api_token, resource_id, poll_interval=0.25, timeout=60, proxies=None
+):
+    """
+    Wait for an asynchronous file operation (copy, extract, compile) to finish
+
+    Polls through wait_until_job_finishes with backoff starting at poll_interval, so
+    fast operations return almost immediately instead of waiting a fixed time.
+
+    Args:
+        ib_host (str): IB host url
+        api_token (str): API token
+        resource_id (str): Job ID returned by the asynchronous operation
+        poll_interval (float): Initial delay in seconds between polls
+        timeout (float): Maximum number of seconds to wait
+
+    Returns:
+        dict: Job status content once the job is done
+
+    Raises:
+        Exception: If the job fails or does not finish before the timeout
+    """
+    return wait_until_job_finishes(
+        ib_host,
+        resource_id,
+        "job",
+        api_token,
+        proxies=proxies,
+        base_delay=poll_interval,
+        max_delay=5,
+        deadline=timeout,
+    )
 
 
 def delete_folder_or_file_from_ib(
@@ -726,7 +948,7 @@ def delete_folder_or_file_from_ib(
         file_api_root = __get_file_api_root(ib_host)
         url = os.path.join(file_api_root, path_to_delete)
         headers = with_instabase_certificate({"Authorization": f"Bearer {api_token}"})
-        requests.delete(url, headers=headers, verify=False, proxies=proxies)
+        _SESSION.delete(url, headers=headers, proxies=proxies)
 
 
 def get_app_details(target_url, api_token, context, app_id, proxies=None):
@@ -810,8 +1032,8 @@ def generate_flow(
     }
 
     try:
-        response = requests.post(
-            url, headers=headers, data=json.dumps(payload), proxies=proxies
+        response = _SESSION.post(
+            url, headers=headers, data=_dumps(payload), proxies=proxies
         )
         response.raise_for_status()
         print(f"Request was successful. Response content: {response.content}")
@@ -839,7 +1061,7 @@ def delete_app(host, token, app_id, org, proxies=None):
     headers = with_instabase_certificate({"Authorization": f"Bearer {token}"})
 
     try:
-        response = requests.delete(url, headers=headers, proxies=proxies)
+        response = _SESSION.delete(url, headers=headers, proxies=proxies)
         response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
         return response
     except requests.exceptions.RequestException as e:
@@ -863,7 +1085,7 @@ def delete_build_project(host, token, project_id, proxies=None):
     headers = with_instabase_certificate({"Authorization": f"Bearer {token}"})
 
     try:
-        response = requests.delete(url, headers=headers, proxies=proxies)
+        response = _SESSION.delete(url, headers=headers, proxies=proxies)
         response.raise_for_status()
         return response
     except requests.exceptions.RequestException as e:
@@ -889,7 +1111,7 @@ def get_published_app_id(ib_host, api_token, project_id, proxies=None):
     headers = with_instabase_certificate({"Authorization": f"Bearer {api_token}"})
 
     try:
-        response = requests.get(url, headers=headers, verify=False, proxies=proxies)
+        response = _SESSION.get(url, headers=headers, proxies=proxies)
         response.raise_for_status()
 
         data = response.json()
@@ -955,8 +1177,8 @@ def trigger_regression_run(
     }
 
     try:
-        response = requests.post(
-            url, headers=headers, data=json.dumps(payload), proxies=proxies
+        response = _SESSION.post(
+            url, headers=headers, data=_dumps(payload), proxies=proxies
         )
         response.raise_for_status()
         response_data = response.json()
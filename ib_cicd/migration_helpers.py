@@ -1,10 +1,12 @@
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from zipfile import ZipFile
 
-import requests
 from ib_cicd.certificates import with_instabase_certificate
 from ib_cicd.ib_helpers import (
+    _SESSION,
     create_folder_if_it_does_not_exists,
     get_file_metadata,
     publish_to_marketplace,
@@ -14,12 +16,25 @@ from ib_cicd.ib_helpers import (
     wait_until_job_finishes,
 )
 
+# Solutions are written to disk in pieces of this size while downloading
+_DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# (host, path, token digest) of files known to exist on an IB environment
+_FILE_EXISTS_CACHE = set()
+
+# Dependency copies are independent download/upload chains, so up to this many
+# run at once
+_MAX_DEPENDENCY_WORKERS = 8
+
 
 def download_solution(
     ib_host, api_token, solution_path, write_to_local=True, unzip_solution=True
 ):
     """Downloads .ibsolution file content.
 
+    When writing to local the body is streamed to disk in chunks, so the
+    returned response's content has already been consumed.
+
     Args:
         ib_host: IB host URL.
         api_token: IB API token.
@@ -29,20 +44,21 @@ def download_solution(
     Returns:
         Response object.
     """
-    resp = read_file_through_api(ib_host, api_token, solution_path)
+    resp = read_file_through_api(
+        ib_host, api_token, solution_path, stream=write_to_local
+    )
 
     if write_to_local:
-        with open("solution.ibflowbin", "wb") as fd:
-            fd.write(resp.content)
+        binary_path = "solution.ibflowbin"
+        with open(binary_path, "wb") as fd:
+            for chunk in resp.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                fd.write(chunk)
 
         if unzip_solution:
-            zip_path = "solution.zip"
-            with open(zip_path, "wb") as fd:
-                fd.write(resp.content)
-            with ZipFile(zip_path, "r") as zip_ref:
-                unzip_dir = Path(zip_path).parent / Path(zip_path).stem
-                zip_ref.extractall(unzip_dir)
-            os.remove(zip_path)
+            # The binary is a zip archive, so it is extracted in place rather
+            # than copied to a .zip first
+            with ZipFile(binary_path, "r") as zip_ref:
+                zip_ref.extractall(Path("solution"))
     return resp
 
 
@@ -78,7 +94,7 @@ def copy_package_from_marketplace(
     copy_url = os.path.join(dev_marketplace_solution_url, "copy?is_v2=true")
     headers = with_instabase_certificate({"Authorization": f"Bearer {api_token}"})
     params = {"new_full_path": intermediate_path}
-    resp = requests.post(copy_url, headers=headers, json=params, verify=False)
+    resp = _SESSION.post(copy_url, headers=headers, json=params)
     resp.raise_for_status()
 
     content = resp.json()
@@ -88,12 +104,19 @@ def copy_package_from_marketplace(
     return intermediate_path
 
 
+def clear_file_exists_cache():
+    """Forget every file previously found by check_if_file_exists_on_ib_env."""
+    _FILE_EXISTS_CACHE.clear()
+
+
 def check_if_file_exists_on_ib_env(
     ib_host, api_token, file_path, use_clients=False, **kwargs
 ):
     """Checks if a file exists on IB environment.
 
-    Uses clients if use_clients is True, otherwise uses Metadata API.
+    Uses clients if use_clients is True, otherwise uses Metadata API. Files found
+    through the Metadata API are remembered for the rest of the run; missing
+    files are checked again on every call since they may be created meanwhile.
 
     Args:
         ib_host: IB host URL.
@@ -110,13 +133,20 @@ def check_if_file_exists_on_ib_env(
         clients, err = kwargs["_FN_CONTEXT_KEY"].get_by_col_name("CLIENTS")
         return clients.ibfile.is_file(file_path)
     else:
+        # Key on a digest of the token so the cache never holds the secret itself
+        token_digest = hashlib.blake2b(api_token.encode(), digest_size=8).hexdigest()
+        cache_key = (ib_host, file_path, token_digest)
+        if cache_key in _FILE_EXISTS_CACHE:
+            return True
+
         # Check file metadata and determine if file already exists
-    metadata_response = get_file_metadata(ib_host, api_token, file_path)
+        metadata_response = get_file_metadata(ib_host, api_token, file_path)
         if metadata_response.status_code == 200:
             try:
                 content_length = int(metadata_response.headers["Content-Length"])
                 if content_length > 100000:
                     # File exists
+                    _FILE_EXISTS_CACHE.add(cache_key)
                     return True
             except (KeyError, ValueError):
                 pass
@@ -239,11 +269,13 @@ def download_dependencies_from_dev_and_upload_to_prod(
         target_ib_host, target_api_token, target_upload_folder
     )
 
-    # Copy all dependency packages from dev to prod
-    upload_paths = []
-    for package_name, package_version in dependency_dict.items():
-        try:
-            resp, uploaded_path = copy_marketplace_package_and_move_to_new_env(
+    # Copy dependency packages from dev to prod on a small worker pool, so one
+    # package is uploaded to prod while the next is still downloading from dev
+    max_workers = max(1, min(_MAX_DEPENDENCY_WORKERS, len(dependency_dict)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            package_name: executor.submit(
+                copy_marketplace_package_and_move_to_new_env,
                 source_ib_host,
                 target_ib_host,
                 package_name,
@@ -255,6 +287,13 @@ def download_dependencies_from_dev_and_upload_to_prod(
                 use_clients=use_clients,
                 **kwargs,
             )
+            for package_name, package_version in dependency_dict.items()
+        }
+
+    upload_paths = []
+    for package_name, package_version in dependency_dict.items():
+        try:
+            resp, uploaded_path = futures[package_name].result()
         except Exception as e:
             print(
                 "Error moving package name: {}, package_version: {}. Error: {}".format(
@@ -269,16 +308,33 @@ def download_dependencies_from_dev_and_upload_to_prod(
     return upload_paths
 
 
-def publish_dependencies(uploaded_ibsolutions, ib_host, api_token):
+def publish_dependencies(uploaded_ibsolutions, ib_host, api_token, max_workers=4):
     """Publishes dependencies to marketplace.
 
+    Each package is published with its own request, so the requests are sent
+    concurrently over the shared session.
+
     Args:
         uploaded_ibsolutions: List of ibsolution paths.
         ib_host: IB host URL.
         api_token: IB API token.
+        max_workers: Maximum number of concurrent publish requests.
     Returns:
-        None
+        List of publish responses, in the order of uploaded_ibsolutions.
     """
-    for ib_solution_path in uploaded_ibsolutions:
-        publish_resp = publish_to_marketplace(ib_host, api_token, ib_solution_path)
-        print("Publish response for %s: %s", ib_solution_path, publish_resp)
+    if not uploaded_ibsolutions:
+        return []
+
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(uploaded_ibsolutions))
+    ) as executor:
+        responses = list(
+            executor.map(
+                lambda path: publish_to_marketplace(ib_host, api_token, path),
+                uploaded_ibsolutions,
+            )
+        )
+
+    for ib_solution_path, publish_resp in zip(uploaded_ibsolutions, responses):
+        print(f"Publish response for {ib_solution_path}: {publish_resp}")
+    return responses
@@ -3,6 +3,8 @@ import json
 import os
 import pathlib
 import re
+import stat
+import tempfile
 import time
 
 from ib_cicd.ib_helpers import (
@@ -34,6 +36,7 @@ from ib_cicd.rebuild_utils import (
     get_settings,
     get_udfs,
     get_validations,
+    is_schema_synced,
     map_field_ids,
     modify_schema,
     modify_settings,
@@ -41,6 +44,7 @@ from ib_cicd.rebuild_utils import (
     post_schema,
     post_settings,
     post_validations,
+    record_schema_sync,
     sanitize_udf_payload,
     run_prompt_udf,
 )
@@ -69,9 +73,31 @@ def download_file(ib_host, api_token, solution_path, proxies=None):
 
 
 def save_to_file(data, file_name):
-    """Save data to a JSON file."""
-    with open(file_name, "w") as f:
+    """Save data to a JSON file, or to an already open text stream.
+
+    The file is written to a temporary file first and moved into place so readers never
+    see a partially written file. A replaced file keeps its permissions.
+    """
+    if hasattr(file_name, "write"):
+        json.dump(data, file_name, indent=4, sort_keys=True)
+        return
+
+    try:
+        mode = stat.S_IMODE(os.stat(file_name).st_mode)
+    except FileNotFoundError:
+        mode = 0o644
+    directory = os.path.dirname(os.path.abspath(file_name))
+    with tempfile.NamedTemporaryFile(
+        "w", dir=directory, suffix=".tmp", delete=False
+    ) as f:
         json.dump(data, f, indent=4, sort_keys=True)
+    try:
+        # NamedTemporaryFile creates the file as 0600
+        os.chmod(f.name, mode)
+        os.replace(f.name, file_name)
+    except OSError:
+        os.remove(f.name)
+        raise
 
 
 def read_binary(file_name="codelabs.ibflowbin"):
@@ -147,8 +173,18 @@ def fetch_details(config, proxies=None):
         )
 
 
-def rebuild_project(config, proxies=None):
-    """Rebuild the project in the target environment."""
+def rebuild_project(
+    config, proxies=None, config_path="config.json", force_schema_sync=False
+):
+    """Rebuild the project in the target environment.
+
+    After a schema is posted, a digest of the source schema and UDFs is recorded in a
+    local marker file under $IB_CICD_CACHE_DIR (default ~/.cache/ib_cicd), keyed by
+    target host and project. A later rebuild with the same digest skips posting the
+    schema. The marker only reflects what this machine posted, so edits made directly
+    on the target are not detected and CI runners without a persistent cache always
+    post. Pass force_schema_sync to post the schema regardless of the marker.
+    """
     target_token = os.environ.get("TARGET_TOKEN")
     target_host_url = os.environ.get("TARGET_HOST_URL")
     target_org = config["target"]["org"]
@@ -189,7 +225,7 @@ def rebuild_project(config, proxies=None):
             target_project_id = response["project_id"]
 
             config["target"]["project_id"] = target_project_id
-            save_to_file(config, "config.json")
+            save_to_file(config, config_path)
 
         # Modify and post settings, schema, and validations
         modified_settings = modify_settings(source_project_id, projects)
@@ -202,26 +238,45 @@ def rebuild_project(config, proxies=None):
         )
 
         sanitized_udfs = sanitize_udf_payload(udfs)
+        # {source UDF id: target UDF id}, shared so a UDF used by both the schema and a
+        # validation is only posted once
+        udf_cache = {}
         target_schema = get_schema(
             target_project_id, target_token, target_host_url, proxies=proxies
         )
-        modified_schema = modify_schema(
-            target_schema,
-            schema,
-            target_project_id,
-            target_token,
-            target_host_url,
-            sanitized_udfs,
-        )
-        result = post_schema(
-            target_project_id,
-            target_token,
-            target_host_url,
-            modified_schema,
-            proxies=proxies,
-        )
+        if not force_schema_sync and is_schema_synced(
+            schema, sanitized_udfs, target_project_id, target_host_url
+        ):
+            print(
+                "Schema hasn't changed since the last rebuild, skipping schema update"
+            )
+        else:
+            modified_schema = modify_schema(
+                target_schema,
+                schema,
+                target_project_id,
+                target_token,
+                target_host_url,
+                sanitized_udfs,
+                udf_cache=udf_cache,
+            )
+            post_schema(
+                target_project_id,
+                target_token,
+                target_host_url,
+                modified_schema,
+                proxies=proxies,
+            )
+            record_schema_sync(
+                schema, sanitized_udfs, target_project_id, target_host_url
+            )
 
-        mappings = map_field_ids(schema, result)
+        # Map field ids against the target schema as GET returns it on both branches;
+        # post_schema dropped the cached copy so this sees the posted schema
+        target_schema = get_schema(
+            target_project_id, target_token, target_host_url, proxies=proxies
+        )
+        mappings = map_field_ids(schema, target_schema)
         modified_validations = modify_validations(
             get_validations(
                 target_project_id, target_token, target_host_url, proxies=proxies
@@ -232,6 +287,7 @@ def rebuild_project(config, proxies=None):
             target_host_url,
             sanitized_udfs,
             mappings,
+            udf_cache=udf_cache,
         )
         for payload in modified_validations:
             result = post_validations(
@@ -453,6 +509,16 @@ def main(args=None):
     parser.add_argument("--delete_build", action="store_true")
     parser.add_argument("--regression", action="store_true")
     parser.add_argument("--delete_app", action="store_true")
+    parser.add_argument(
+        "--force_schema_sync",
+        action="store_true",
+        help="Post the schema on rebuild even if the local sync marker matches",
+    )
+    parser.add_argument(
+        "--config",
+        default=os.environ.get("IB_CICD_CONFIG", "config.json"),
+        help="Path to the configuration file (defaults to $IB_CICD_CONFIG or config.json)",
+    )
     if args is not None:
         args = parser.parse_args(args)
     else:
@@ -462,7 +528,7 @@ def main(args=None):
     new_app_id = None
 
     try:
-        config = load_config("config.json")
+        config = load_config(args.config)
         source = config["source"]
         target = config["target"]
 
@@ -628,7 +694,7 @@ def main(args=None):
                     source_host_url, source_token, project_id, proxies=proxy
                 )
                 config["source"]["app_id"] = new_app_id
-                save_to_file(config, "config.json")
+                save_to_file(config, args.config)
                 print("Getting app details...")
                 response = get_app_details(
                     source_host_url, source_token, source_org, new_app_id, proxies=proxy
@@ -683,7 +749,12 @@ def main(args=None):
 
         if args.create_build_project:
             print("Creating build project...")
-            target_project_id = rebuild_project(config, proxies=proxy)
+            target_project_id = rebuild_project(
+                config,
+                proxies=proxy,
+                config_path=args.config,
+                force_schema_sync=args.force_schema_sync,
+            )
             print(f"Build project created successfully with ID: {target_project_id}")
 
         if args.publish_build_app:
@@ -696,7 +767,12 @@ def main(args=None):
 
             # it is to support older version (can remove this in future)
             if not target_project_id:
-                target_project_id = rebuild_project(config, proxies=proxy)
+                target_project_id = rebuild_project(
+                    config,
+                    proxies=proxy,
+                    config_path=args.config,
+                    force_schema_sync=args.force_schema_sync,
+                )
                 print(
                     f"Build project created successfully with ID: {target_project_id}"
                 )
@@ -768,7 +844,7 @@ def main(args=None):
             print(response)
 
             config["target"]["app_id"] = new_app_id
-            save_to_file(config, "config.json")
+            save_to_file(config, args.config)
             print("Great news! Your app has been published successfully.")
 
         if (args.create_build_project or args.publish_build_app) and not args.rebuild:
@@ -2,7 +2,6 @@ import argparse
 import json
 import os
 import pathlib
-import re
 import time
 
 from ib_cicd.ib_helpers import (
@@ -29,11 +28,11 @@ from ib_cicd.migration_helpers import (
 from ib_cicd.promote_build_solution import (
     load_config,
     load_from_file,
-    read_binary,
     save_to_file,
     run_regression_tests,
 )
 from ib_cicd.promote_solution import (
+    VERSION_PATTERN,
     get_latest_binary_path,
     parse_dependencies,
     upload_zip_to_instabase,
@@ -55,16 +54,12 @@ def get_latest_flow_version(flow_path, ib_host, ib_token):
     latest_version = "0.0.0"
     try:
         paths = list_directory(ib_host, flow_path, ib_token)
-        versions = []
-        for path in paths:
-            p = pathlib.Path(path)
-            if re.fullmatch(r"\d+\.\d+\.\d+", p.stem):
-                versions.append(p.stem)
+        stems = (pathlib.PurePosixPath(path).stem for path in paths)
+        versions = [stem for stem in stems if VERSION_PATTERN.fullmatch(stem)]
 
         if versions:
-            # Sort versions using version_tuple to properly compare semantic versions
-            versions.sort(key=version_tuple)
-            latest_version = versions[-1]
+            # Compare as integer tuples so 0.10.0 is newer than 0.9.0
+            latest_version = max(versions, key=version_tuple)
 
         return latest_version
 
@@ -126,6 +121,11 @@ def main(args=None):
     parser.add_argument("--create_deployment", action="store_true")
     parser.add_argument("--delete_app", action="store_true")
     parser.add_argument("--regression", action="store_true")
+    parser.add_argument(
+        "--config",
+        default=os.environ.get("IB_CICD_CONFIG", "config.json"),
+        help="Path to the configuration file (defaults to $IB_CICD_CONFIG or config.json)",
+    )
     if args is not None:
         args = parser.parse_args(args)
     else:
@@ -134,7 +134,7 @@ def main(args=None):
     new_app_id = None
     try:
         # Load configuration
-        config = load_config("config.json")
+        config = load_config(args.config)
 
         # Source environment config
         SOURCE_IB_HOST = os.environ.get("SOURCE_HOST_URL")
@@ -278,10 +278,11 @@ def main(args=None):
                 SOLUTION_BUILDER_NAME,
                 f"{SOLUTION_BUILDER_NAME}.ibflowbin",
             )
-            binary_content = read_binary("solution.ibflowbin")
-            upload_file(
-                TARGET_IB_HOST, TARGET_IB_API_TOKEN, target_binary_path, binary_content
-            )
+            # Stream the binary from disk rather than loading it into memory
+            with open("solution.ibflowbin", "rb") as binary_file:
+                upload_file(
+                    TARGET_IB_HOST, TARGET_IB_API_TOKEN, target_binary_path, binary_file
+                )
             time.sleep(2)
 
             # Unzip solution contents
@@ -361,7 +362,7 @@ def main(args=None):
                 TARGET_IB_HOST, TARGET_IB_API_TOKEN, response["job_id"]
             )
             config["target"]["app_id"] = new_app_id
-            save_to_file(config, "config.json")
+            save_to_file(config, args.config)
             print(
                 "Great news! Your app has been successfully published. The new app ID is: %s",
                 new_app_id,
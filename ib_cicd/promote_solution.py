@@ -1,8 +1,12 @@
 import argparse
+import io
 import os
 import re
-import shutil
+import tempfile
 import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
 
 
 from ib_cicd.ib_helpers import (
@@ -20,6 +24,7 @@ from ib_cicd.ib_helpers import (
     upload_file,
     read_image,
     delete_app,
+    wait_for_completion,
 )
 from ib_cicd.migration_helpers import (
     download_dependencies_from_dev_and_upload_to_prod,
@@ -29,11 +34,21 @@ from ib_cicd.migration_helpers import (
 from ib_cicd.promote_build_solution import (
     load_config,
     load_from_file,
-    read_binary,
     save_to_file,
     run_regression_tests,
 )
 
+VERSION_PATTERN = re.compile(r"\d+\.\d+\.\d+")
+# "name==version", allowing whitespace around either side of the "=="
+DEPENDENCY_PATTERN = re.compile(r"\s*([^=\s]+)\s*==\s*([^=\s]+)\s*")
+
+# Solutions up to this size are archived in memory, larger ones in a temp file
+IN_MEMORY_ARCHIVE_LIMIT = 64 * 1024 * 1024
+
+# Seconds to wait after an asynchronous call that returned no job ID to poll on, the
+# fixed delay the steps used before job polling
+NO_JOB_ID_WAIT = 3
+
 
 def copy_solution_to_working_dir(
     source_host, source_token, source_dir, rel_flow_path, new_solution_dir
@@ -46,17 +61,83 @@ def copy_solution_to_working_dir(
         source_dir: Source directory path
         rel_flow_path: Relative flow path
         new_solution_dir: New solution directory path
+
+    Returns:
+        List of copy responses from API
     """
-    flow_path = os.path.join(source_dir, rel_flow_path)
-    modules_path = os.path.join(source_dir, *rel_flow_path.split("/")[:-1], "modules")
+    source_dir = PurePosixPath(source_dir)
+    flow_path = source_dir / rel_flow_path
+    modules_path = flow_path.parent / "modules"
+    responses = []
     for path in [flow_path, modules_path]:
-        new_path = path.replace(source_dir, new_solution_dir)
-        copy_file_within_ib(
-            source_host, source_token, path, new_path, use_clients=False
+        new_path = PurePosixPath(new_solution_dir) / path.relative_to(source_dir)
+        responses.append(
+            copy_file_within_ib(
+                source_host, source_token, str(path), str(new_path), use_clients=False
+            )
         )
+    return responses
+
+
+def wait_for_async_response(ib_host, api_token, response):
+    """Wait until the job started by an asynchronous API call is done.
+
+    If the response has no job ID there is nothing to poll, so a warning is printed and
+    the call falls back to waiting NO_JOB_ID_WAIT seconds before the next step.
 
+    Args:
+        ib_host: Instabase host
+        api_token: API token
+        response: Response returned by the API call
+    """
+    try:
+        job_id = response.json().get("job_id")
+    except ValueError:
+        job_id = None
+    if job_id:
+        wait_for_completion(ib_host, api_token, job_id)
+        return
+    print(
+        f"Warning: no job ID in the response, waiting {NO_JOB_ID_WAIT}s for the "
+        f"operation to finish"
+    )
+    time.sleep(NO_JOB_ID_WAIT)
+
+
+def build_solution_archive(source_dir="solution"):
+    """Zip a local solution directory into a file object ready for upload.
 
-def upload_zip_to_instabase(target_path, target_host, target_token, solution_name):
+    Args:
+        source_dir: Local directory to archive
+
+    Returns:
+        File object positioned at the start of the zip archive
+    """
+    entries = []
+    source_size = 0
+    for root, dirs, files in os.walk(source_dir):
+        dirs.sort()
+        for name in dirs + sorted(files):
+            path = os.path.join(root, name)
+            entries.append(path)
+            if os.path.isfile(path):
+                source_size += os.path.getsize(path)
+
+    archive_file = (
+        io.BytesIO()
+        if source_size <= IN_MEMORY_ARCHIVE_LIMIT
+        else tempfile.TemporaryFile()
+    )
+    with zipfile.ZipFile(archive_file, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path in entries:
+            archive.write(path, os.path.relpath(path, source_dir))
+    archive_file.seek(0)
+    return archive_file
+
+
+def upload_zip_to_instabase(
+    target_path, target_host, target_token, solution_name, source_dir="solution"
+):
     """Create and upload solution zip archive to Instabase.
 
     Args:
@@ -64,6 +145,7 @@ def upload_zip_to_instabase(target_path, target_host, target_token, solution_nam
         target_host: Target Instabase host
         target_token: Target API token
         solution_name: Name of solution
+        source_dir: Local directory containing the solution
 
     Returns:
         Upload response from API
@@ -72,10 +154,9 @@ def upload_zip_to_instabase(target_path, target_host, target_token, solution_nam
         Exception: If zip creation or upload fails
     """
     try:
-        shutil.make_archive("solution", "zip", "solution")
-        path_to_upload = os.path.join(target_path, f"{solution_name}.zip")
+        path_to_upload = str(PurePosixPath(target_path, f"{solution_name}.zip"))
 
-        with open("solution.zip", "rb") as upload_data:
+        with build_solution_archive(source_dir) as upload_data:
             return upload_file(target_host, target_token, path_to_upload, upload_data)
     except Exception as e:
         print(
@@ -117,28 +198,22 @@ def get_latest_binary_path(api_token, ib_host, solution_path):
         raise Exception(
             f"We couldn't find any solution files at {solution_path}. Please double-check that you've entered the correct location for your solution and try again."
         )
+    if len(paths) == 1:
+        # A lone binary is returned whether or not it is versioned
+        return paths[0]
 
     versioned_binaries = []
     simple_binaries = []
 
     for path in paths:
-        filename = os.path.basename(path)
-        version = filename.replace(".ibflowbin", "")
-        if re.fullmatch(r"\d+\.\d+\.\d+", version):
-            versioned_binaries.append(path)
+        version = PurePosixPath(path).name.replace(".ibflowbin", "")
+        if VERSION_PATTERN.fullmatch(version):
+            versioned_binaries.append((version_tuple(version), path))
         else:
             simple_binaries.append(path)
 
     if versioned_binaries:
-        latest_version = "0.0.0"
-        latest_path = None
-        for path in versioned_binaries:
-            filename = os.path.basename(path)
-            version = filename.replace(".ibflowbin", "")
-            if version_tuple(version) > version_tuple(latest_version):
-                latest_version = version
-                latest_path = path
-        return latest_path
+        return max(versioned_binaries)[1]
     elif simple_binaries:
         return simple_binaries[0]
     else:
@@ -159,11 +234,8 @@ def parse_dependencies(dependencies):
     if not dependencies:
         return {}
     try:
-        return {
-            m.split("==")[0].strip(): m.split("==")[1].strip()
-            for m in dependencies
-            if "==" in m
-        }
+        matches = (DEPENDENCY_PATTERN.fullmatch(d) for d in dependencies)
+        return {m[1]: m[2] for m in matches if m}
     except Exception as e:
         print(
             f"There seems to be an issue with the dependencies list. Each dependency should be written as 'name==version' (for example, 'my-package==1.0.0'). Please check your list and fix any formatting issues. {e}"
@@ -181,6 +253,11 @@ def main(args=None):
     parser.add_argument("--create_deployment", action="store_true")
     parser.add_argument("--delete_app", action="store_true")
     parser.add_argument("--regression", action="store_true")
+    parser.add_argument(
+        "--config",
+        default=os.environ.get("IB_CICD_CONFIG", "config.json"),
+        help="Path to the configuration file (defaults to $IB_CICD_CONFIG or config.json)",
+    )
     if args is not None:
         args = parser.parse_args(args)
     else:
@@ -189,7 +266,7 @@ def main(args=None):
     new_app_id = None
     try:
         # Load configuration
-        config = load_config("config.json")
+        config = load_config(args.config)
 
         # Source environment config
         source_config = config["source"]
@@ -202,12 +279,11 @@ def main(args=None):
         SOURCE_WORKSPACE = source_config.get("workspace")
 
         if FLOW_PATH:
-            SOURCE_SOLUTION_DIR = "/".join(FLOW_PATH.split("/")[:-1])
-            REL_FLOW_PATH = FLOW_PATH.split("/")[-1]
-            SOURCE_WORKING_DIR = os.path.join(
-                SOURCE_SOLUTION_DIR, "CICD", SOURCE_SOLUTION_DIR.split("/")[-1]
-            )
-            FLOW_NAME = REL_FLOW_PATH.split(".")[0]
+            flow_path = PurePosixPath(FLOW_PATH)
+            SOURCE_SOLUTION_DIR = str(flow_path.parent)
+            REL_FLOW_PATH = flow_path.name
+            SOURCE_WORKING_DIR = str(flow_path.parent / "CICD" / flow_path.parent.name)
+            FLOW_NAME = REL_FLOW_PATH.partition(".")[0]
         else:
             SOURCE_SOLUTION_DIR = None
             REL_FLOW_PATH = None
@@ -227,70 +303,92 @@ def main(args=None):
         )
 
         if args.compile_solution:
-            copy_solution_to_working_dir(
+            copy_responses = copy_solution_to_working_dir(
                 SOURCE_IB_HOST,
                 SOURCE_IB_API_TOKEN,
                 SOURCE_SOLUTION_DIR,
                 REL_FLOW_PATH,
                 SOURCE_WORKING_DIR,
             )
-            time.sleep(3)
-            compile_solution(
+            for response in copy_responses:
+                wait_for_async_response(SOURCE_IB_HOST, SOURCE_IB_API_TOKEN, response)
+            response = compile_solution(
                 SOURCE_IB_HOST,
                 SOURCE_IB_API_TOKEN,
                 SOURCE_WORKING_DIR,
                 REL_FLOW_PATH,
             )
-            time.sleep(3)
+            wait_for_async_response(SOURCE_IB_HOST, SOURCE_IB_API_TOKEN, response)
 
         if args.download_solution:
-            binary_path = get_latest_binary_path(
-                SOURCE_IB_API_TOKEN, SOURCE_IB_HOST, SOURCE_WORKING_DIR
-            )
-            download_solution(SOURCE_IB_HOST, SOURCE_IB_API_TOKEN, binary_path)
-            time.sleep(2)
-            delete_folder_or_file_from_ib(
-                os.path.join(SOURCE_SOLUTION_DIR, "CICD"),
-                SOURCE_IB_HOST,
-                SOURCE_IB_API_TOKEN,
-                use_clients=False,
-            )
-
-            if app_id:
-                print("Getting app details...")
-                response = get_app_details(
-                    SOURCE_IB_HOST, SOURCE_IB_API_TOKEN, SOURCE_ORG, app_id
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                # App and deployment details don't depend on the solution download,
+                # so fetch them while the binary is being downloaded
+                app_details_future = (
+                    executor.submit(
+                        get_app_details,
+                        SOURCE_IB_HOST,
+                        SOURCE_IB_API_TOKEN,
+                        SOURCE_ORG,
+                        app_id,
+                    )
+                    if app_id
+                    else None
                 )
-                details = response.get("solution", {})
-                if not details:
-                    print(
-                        "We couldn't find any information about this app. Please verify that you've entered the correct app ID in your configuration and try again."
+                deployment_details_future = (
+                    executor.submit(
+                        get_deployment_details,
+                        SOURCE_IB_HOST,
+                        SOURCE_IB_API_TOKEN,
+                        SOURCE_ORG,
+                        deployment_id,
                     )
-                    raise Exception("App details not found.")
-                save_to_file(details, "app_details.json")
-
-                # Download app icon if solution path exists
-                if details.get("solution_path"):
-                    print("Downloading app icon...")
-                    try:
-                        icon_data = read_file_through_api(
-                            SOURCE_IB_HOST,
-                            SOURCE_IB_API_TOKEN,
-                            details["solution_path"] + "/icon.png",
-                        ).content
-                    except Exception as e:
-                        print(f"Failed to download app icon: {e}")
-                        icon_data = read_image()
-
-                    with open("icon.png", "wb") as f:
-                        f.write(icon_data)
-
-            if deployment_id:
-                print("Getting deployment details...")
-                response = get_deployment_details(
-                    SOURCE_IB_HOST, SOURCE_IB_API_TOKEN, SOURCE_ORG, deployment_id
+                    if deployment_id
+                    else None
                 )
-                save_to_file(response, "deployment_details.json")
+
+                binary_path = get_latest_binary_path(
+                    SOURCE_IB_API_TOKEN, SOURCE_IB_HOST, SOURCE_WORKING_DIR
+                )
+                download_solution(SOURCE_IB_HOST, SOURCE_IB_API_TOKEN, binary_path)
+                delete_folder_or_file_from_ib(
+                    str(PurePosixPath(SOURCE_SOLUTION_DIR, "CICD")),
+                    SOURCE_IB_HOST,
+                    SOURCE_IB_API_TOKEN,
+                    use_clients=False,
+                )
+
+                if app_details_future:
+                    print("Getting app details...")
+                    response = app_details_future.result()
+                    details = response.get("solution", {})
+                    if not details:
+                        print(
+                            "We couldn't find any information about this app. Please verify that you've entered the correct app ID in your configuration and try again."
+                        )
+                        raise Exception("App details not found.")
+                    save_to_file(details, "app_details.json")
+
+                    # Download app icon if solution path exists
+                    if details.get("solution_path"):
+                        print("Downloading app icon...")
+                        try:
+                            icon_data = read_file_through_api(
+                                SOURCE_IB_HOST,
+                                SOURCE_IB_API_TOKEN,
+                                details["solution_path"] + "/icon.png",
+                            ).content
+                        except Exception as e:
+                            print(f"Failed to download app icon: {e}")
+                            icon_data = read_image()
+
+                        with open("icon.png", "wb") as f:
+                            f.write(icon_data)
+
+                if deployment_details_future:
+                    print("Getting deployment details...")
+                    response = deployment_details_future.result()
+                    save_to_file(response, "deployment_details.json")
 
         if args.regression:
             run_regression_tests(
@@ -303,27 +401,38 @@ def main(args=None):
             )
 
         if args.promote_solution_to_target:
-            upload_zip_to_instabase(
-                TARGET_IB_PATH, TARGET_IB_HOST, TARGET_IB_API_TOKEN, FLOW_NAME
-            )
-
-            # Upload the solution binary to target environment
-            target_binary_path = os.path.join(
-                TARGET_IB_PATH, FLOW_NAME, f"{FLOW_NAME}.ibflowbin"
-            )
-            binary_content = read_binary("solution.ibflowbin")
-            upload_file(
-                TARGET_IB_HOST,
-                TARGET_IB_API_TOKEN,
-                target_binary_path,
-                binary_content,
+            target_binary_path = str(
+                PurePosixPath(TARGET_IB_PATH, FLOW_NAME, f"{FLOW_NAME}.ibflowbin")
             )
-            time.sleep(2)
+            # Upload the solution zip and binary to target environment concurrently,
+            # streaming the binary from disk rather than loading it into memory
+            with (
+                open("solution.ibflowbin", "rb") as binary_file,
+                ThreadPoolExecutor(max_workers=2) as executor,
+            ):
+                uploads = [
+                    executor.submit(
+                        upload_zip_to_instabase,
+                        TARGET_IB_PATH,
+                        TARGET_IB_HOST,
+                        TARGET_IB_API_TOKEN,
+                        FLOW_NAME,
+                    ),
+                    executor.submit(
+                        upload_file,
+                        TARGET_IB_HOST,
+                        TARGET_IB_API_TOKEN,
+                        target_binary_path,
+                        binary_file,
+                    ),
+                ]
+                for upload in uploads:
+                    upload.result()
 
             # Unzip solution contents
-            zip_path = os.path.join(TARGET_IB_PATH, f"{FLOW_NAME}.zip")
-            unzip_files(TARGET_IB_HOST, TARGET_IB_API_TOKEN, zip_path)
-            time.sleep(3)
+            zip_path = str(PurePosixPath(TARGET_IB_PATH, f"{FLOW_NAME}.zip"))
+            response = unzip_files(TARGET_IB_HOST, TARGET_IB_API_TOKEN, zip_path)
+            wait_for_async_response(TARGET_IB_HOST, TARGET_IB_API_TOKEN, response)
             delete_folder_or_file_from_ib(
                 zip_path, TARGET_IB_HOST, TARGET_IB_API_TOKEN, use_clients=False
             )
@@ -353,7 +462,7 @@ def main(args=None):
                 raise Exception("App ID not found in configuration.")
 
             app_details = load_from_file("app_details.json")
-            icon_path = os.path.join(TARGET_IB_PATH, FLOW_NAME, "icon.png")
+            icon_path = str(PurePosixPath(TARGET_IB_PATH, FLOW_NAME, "icon.png"))
 
             # Upload the locally saved icon
             if os.path.exists("icon.png"):
@@ -369,7 +478,7 @@ def main(args=None):
             ibflowbin_path = get_latest_binary_path(
                 TARGET_IB_API_TOKEN,
                 TARGET_IB_HOST,
-                os.path.join(TARGET_IB_PATH, FLOW_NAME),
+                str(PurePosixPath(TARGET_IB_PATH, FLOW_NAME)),
             )
 
             payload = {
@@ -392,7 +501,7 @@ def main(args=None):
                 TARGET_IB_HOST, TARGET_IB_API_TOKEN, response["job_id"]
             )
             config["target"]["app_id"] = new_app_id
-            save_to_file(config, "config.json")
+            save_to_file(config, args.config)
             print("Great news! Your app has been published successfully.")
 
         if args.create_deployment:
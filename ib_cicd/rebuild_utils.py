@@ -1,18 +1,126 @@
+import copy
+import hashlib
 import json
-import requests
+import os
+import secrets
+import threading
 import time
-from uuid import uuid4
-import copy
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+
+import requests
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional, installed with the "fast" extra
+    orjson = None
+
+from ib_cicd.certificates import load_instabase_certificate, with_instabase_certificate
+from ib_cicd.ib_helpers import _tls_verify, create_session
+
+# Connections kept open to a host, also the number of requests sent concurrently
+_MAX_CONNECTIONS = 32
+
+# Shared by every helper below so the per-field and per-rule calls reuse connections
+_SESSION = create_session(
+    pool_connections=16,
+    pool_maxsize=_MAX_CONNECTIONS,
+    max_retries=Retry(
+        total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]
+    ),
+)
+
+# Used by loops that retry on their own schedule, adapter retries would run their own
+# backoff inside a single attempt and push it past the loop's deadline
+_POLL_SESSION = create_session(pool_connections=4, pool_maxsize=4)
+
+# Same TLS policy as the ib_helpers session, see _tls_verify
+_SESSION.verify = _POLL_SESSION.verify = _tls_verify()
+
+# Seconds given to a prompt UDF's examples and generated code to settle, the API has no
+# status to poll for either
+PROMPT_UDF_SETTLE_WAIT = 10
+
+
+def _loads(content):
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+# UDF uploads are independent of each other, so they are posted concurrently. One worker
+# per pooled connection keeps every connection busy without requests queueing for a socket.
+_UDF_EXECUTOR = ThreadPoolExecutor(max_workers=_MAX_CONNECTIONS)
+
+
+@lru_cache(maxsize=16)
+def _build_headers(token, org, certificate):
+    headers = {"Authorization": f"Bearer {token}"}
+    if org:
+        headers["Ib-Context"] = org
+    return with_instabase_certificate(headers)
 
-from ib_cicd.certificates import with_instabase_certificate
+
+def _headers(token, org=None):
+    """
+    Return the request headers for a token (and org), reused across calls
+
+    The certificate is part of the cache key so clearing the certificate cache is respected.
+    The returned dict is shared and must not be modified.
+    """
+    return _build_headers(token, org, load_instabase_certificate())
+
+
+# GET responses reused within a run: {(getter, host_url, project_id, token): (expires_at, data)}
+_RESPONSE_CACHE = {}
+_RESPONSE_CACHE_TTL = 60
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def _cache_response(func):
+    """
+    Cache the response of a project GET helper for _RESPONSE_CACHE_TTL seconds
+
+    Callers such as modify_settings and modify_validations edit the response in place,
+    so every call gets its own deep copy of the cached data.
+    """
+
+    @wraps(func)
+    def wrapper(project_id, token, host_url, proxies=None):
+        key = (func.__name__, host_url, project_id, token)
+        with _RESPONSE_CACHE_LOCK:
+            cached = _RESPONSE_CACHE.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return copy.deepcopy(cached[1])
+        data = func(project_id, token, host_url, proxies=proxies)
+        with _RESPONSE_CACHE_LOCK:
+            _RESPONSE_CACHE[key] = (time.monotonic() + _RESPONSE_CACHE_TTL, data)
+        return copy.deepcopy(data)
+
+    return wrapper
+
+
+def invalidate_response_cache(project_id=None):
+    """Drop the cached GET responses of a project, or of every project if none is given"""
+    with _RESPONSE_CACHE_LOCK:
+        if project_id is None:
+            _RESPONSE_CACHE.clear()
+            return
+        for key in [key for key in _RESPONSE_CACHE if key[2] == project_id]:
+            del _RESPONSE_CACHE[key]
+
+
+def _projects_url(host_url):
+    """Base url of the build projects API on a host"""
+    return f"{host_url}/api/v2/aihub/build/projects"
 
 
 def create_build_project(project_name, token, target_url, org, workspace, proxies=None):
     """Creates a build project in the target environment"""
-    url = f"{target_url}/api/v2/aihub/build/projects"
-    headers = with_instabase_certificate(
-        {"Authorization": f"Bearer {token}", "Ib-Context": org}
-    )
+    url = _projects_url(target_url)
+    headers = _headers(token, org)
     current_unix_timestamp = int(time.time())
     data = {
         "name": project_name,
@@ -35,22 +143,25 @@ def create_build_project(project_name, token, target_url, org, workspace, proxie
         "creation_base": "NONE",
     }
 
-    response = requests.post(url=url, headers=headers, json=data, proxies=proxies)
+    response = _SESSION.post(url=url, headers=headers, json=data, proxies=proxies)
     response.raise_for_status()
     return response.json()
 
 
 #### Functions for Settings ####
 
+_SETTINGS_FIELDS_TO_REMOVE = frozenset(
+    ("id", "project_root", "data_root", "workspace", "name")
+)
 
-def clean_function_data(function_data):
-    """Remove unnecessary fields and set return type."""
-    fields_to_remove = ["id", "project_root", "data_root", "workspace", "name"]
 
-    for field in fields_to_remove:
+def clean_settings_function_data(function_data):
+    """Remove project specific fields from the settings payload."""
+    for field in _SETTINGS_FIELDS_TO_REMOVE:
         function_data.pop(field, None)
 
 
+@_cache_response
 def get_settings(project_id, token, host_url, proxies=None):
     """
     Return the schema response
@@ -62,13 +173,11 @@ def get_settings(project_id, token, host_url, proxies=None):
             ocr settings response
     """
 
-    get_ocr_url = (
-        f"{host_url}/api/v2/aihub/build/projects?proj_id={project_id}&query_option=uuid"
-    )
-    headers = with_instabase_certificate({"Authorization": f"Bearer {token}"})
-    response = requests.get(url=get_ocr_url, headers=headers, proxies=proxies)
+    get_ocr_url = f"{_projects_url(host_url)}?proj_id={project_id}&query_option=uuid"
+    headers = _headers(token)
+    response = _SESSION.get(url=get_ocr_url, headers=headers, proxies=proxies)
     response.raise_for_status()  # This will raise an error
-    return response.json()
+    return _loads(response.content)
 
 
 def post_settings(project_id, token, host_url, data, proxies=None):
@@ -78,14 +187,15 @@ def post_settings(project_id, token, host_url, data, proxies=None):
             project_id: the build project id
             token: auth token
             host_url: the environment project is in
-            data: target ocr settings to be added
+            data: target ocr settings to be added, sent as compact JSON
         Return:
             status response
     """
-    get_ocr_url = f"{host_url}/api/v2/aihub/build/projects?project_id={project_id}"
-    headers = with_instabase_certificate({"Authorization": f"Bearer {token}"})
-    response = requests.patch(
-        url=get_ocr_url, headers=headers, data=data, proxies=proxies
+    get_ocr_url = f"{_projects_url(host_url)}?project_id={project_id}"
+    headers = _headers(token)
+    invalidate_response_cache(project_id)
+    response = _SESSION.patch(
+        url=get_ocr_url, headers=headers, json=data, proxies=proxies
     )
     response.raise_for_status()  # This will raise an error
     return response.text
@@ -96,14 +206,15 @@ def modify_settings(project_id, response):
     for item in response["projects"]:
         if item["id"] == project_id:
             payload = item
-            clean_function_data(payload)
+            clean_settings_function_data(payload)
             break
-    return json.dumps(payload, indent=4)
+    return payload
 
 
 #### Function for UDFs ####
 
 
+@_cache_response
 def get_udfs(project_id, token, host_url, proxies=None):
     """
     Return the udfs response
@@ -115,11 +226,11 @@ def get_udfs(project_id, token, host_url, proxies=None):
             schema response
     """
 
-    get_udfs_url = f"{host_url}/api/v2/aihub/build/projects/{project_id}/udfs"
-    headers = with_instabase_certificate({"Authorization": f"Bearer {token}"})
-    response = requests.get(url=get_udfs_url, headers=headers, proxies=proxies)
+    get_udfs_url = f"{_projects_url(host_url)}/{project_id}/udfs"
+    headers = _headers(token)
+    response = _SESSION.get(url=get_udfs_url, headers=headers, proxies=proxies)
     response.raise_for_status()  # This will raise an error
-    return response.json()
+    return _loads(response.content)
 
 
 def post_udf(project_id, token, target_url, data, proxies=None):
@@ -133,26 +244,105 @@ def post_udf(project_id, token, target_url, data, proxies=None):
         Return:
             json response
     """
-    post_udfs_url = f"{target_url}/api/v2/aihub/build/projects/{project_id}/udfs"
-    headers = with_instabase_certificate({"Authorization": f"Bearer {token}"})
-    response = requests.post(
+    post_udfs_url = f"{_projects_url(target_url)}/{project_id}/udfs"
+    headers = _headers(token)
+    invalidate_response_cache(project_id)
+    response = _SESSION.post(
         url=post_udfs_url, headers=headers, json=data, proxies=proxies
     )
     response.raise_for_status()
     return response.json()
 
 
-def clean_function_data(function_data):
-    """Remove unnecessary fields and set return type."""
-    fields_to_remove = [
+# Hosts without a usable batch endpoint, they only get single UDF posts
+_BATCH_UNSUPPORTED_HOSTS = set()
+
+# Statuses meaning the host has no batch route, any other error may have created UDFs
+_BATCH_MISSING_STATUSES = frozenset({404, 405, 501})
+
+
+def post_udfs_batch(project_id, token, target_url, udfs, proxies=None):
+    """
+    Post several UDFs in a single request
+        Args:
+            project_id: the build project id
+            token: auth token
+            target_url: the environment project is in
+            udfs: {source function id: udf payload}
+        Return:
+            {source function id: new udf id}, or None if the host has no batch
+            endpoint, in which case the UDFs should be posted one by one
+        Raises:
+            requests.HTTPError: for other error statuses, the batch may have been
+                partially applied so posting the UDFs again could duplicate them
+    """
+    if target_url in _BATCH_UNSUPPORTED_HOSTS:
+        return None
+    post_batch_url = f"{_projects_url(target_url)}/{project_id}/udfs:batch"
+    invalidate_response_cache(project_id)
+    response = _SESSION.post(
+        url=post_batch_url,
+        headers=_headers(token),
+        json={"udfs": udfs},
+        proxies=proxies,
+    )
+    if response.status_code in _BATCH_MISSING_STATUSES:
+        _BATCH_UNSUPPORTED_HOSTS.add(target_url)
+        return None
+    response.raise_for_status()
+    try:
+        return _loads(response.content)["udf_ids"]
+    except (ValueError, KeyError, TypeError):
+        # A 2xx without a udf_ids mapping isn't the batch endpoint we know
+        _BATCH_UNSUPPORTED_HOSTS.add(target_url)
+        return None
+
+
+def post_udfs(project_id, token, target_url, udfs, proxies=None):
+    """
+    Post UDFs with one batch request, or concurrently one by one if batching isn't supported
+        Args:
+            udfs: {source function id: udf payload}
+        Return:
+            {source function id: new udf id}
+    """
+    if not udfs:
+        return {}
+    new_ids = post_udfs_batch(project_id, token, target_url, udfs, proxies=proxies)
+    if new_ids is None:
+        function_ids = list(udfs)
+        new_ids = dict(
+            zip(
+                function_ids,
+                _UDF_EXECUTOR.map(
+                    lambda function_id: post_udf(
+                        project_id,
+                        token,
+                        target_url,
+                        udfs[function_id],
+                        proxies=proxies,
+                    )["udf_id"],
+                    function_ids,
+                ),
+            )
+        )
+    return new_ids
+
+
+_UDF_FIELDS_TO_REMOVE = frozenset(
+    (
         "docstring",
         "last_updated_at",
         "lambda_id",
         "lambda_udf_id",
         "lambda_end_of_life",
-    ]
+    )
+)
+
 
-    for field in fields_to_remove:
+def clean_udf_function_data(function_data):
+    """Remove unnecessary fields and set return type."""
+    for field in _UDF_FIELDS_TO_REMOVE:
         function_data.pop(
             field, None
         )  # Use pop to avoid KeyError if the field does not exist
@@ -162,22 +352,29 @@ def clean_function_data(function_data):
 
 def sanitize_udf_payload(result):
     """Create a sanitized payload for UDFS."""
-    payload = copy.deepcopy(result)
-
-    for function_id in payload:
-        clean_function_data(payload[function_id])
-
-    return payload
+    # Only the top level of each function changes, so it is rebuilt without the removed
+    # fields and the nested values are shared with the input
+    return {
+        function_id: {
+            **{
+                key: value
+                for key, value in function_data.items()
+                if key not in _UDF_FIELDS_TO_REMOVE
+            },
+            "return_type": "string",
+        }
+        for function_id, function_data in result.items()
+    }
 
 
 #### Functions for Schema ####
 
 
 def generate_id():
-    uuid = str(uuid4()).replace("-", "")
-    return uuid[:21]
+    return secrets.token_hex(11)[:21]
 
 
+@_cache_response
 def get_schema(project_id, token, host_url, proxies=None):
     """
     Return the schema response
@@ -189,11 +386,11 @@ def get_schema(project_id, token, host_url, proxies=None):
             schema response
     """
 
-    get_schema_url = f"{host_url}/api/v2/aihub/build/projects/{project_id}/schema"
-    headers = with_instabase_certificate({"Authorization": f"Bearer {token}"})
-    response = requests.get(url=get_schema_url, headers=headers, proxies=proxies)
+    get_schema_url = f"{_projects_url(host_url)}/{project_id}/schema"
+    headers = _headers(token)
+    response = _SESSION.get(url=get_schema_url, headers=headers, proxies=proxies)
     response.raise_for_status()  # This will raise an error
-    return response.json()
+    return _loads(response.content)
 
 
 def post_schema(project_id, token, target_url, data, proxies=None):
@@ -207,53 +404,111 @@ def post_schema(project_id, token, target_url, data, proxies=None):
         Return:
             json response
     """
-    post_schema_url = f"{target_url}/api/v2/aihub/build/projects/{project_id}/schema"
-    headers = with_instabase_certificate({"Authorization": f"Bearer {token}"})
-    response = requests.post(
+    post_schema_url = f"{_projects_url(target_url)}/{project_id}/schema"
+    headers = _headers(token)
+    invalidate_response_cache(project_id)
+    response = _SESSION.post(
         url=post_schema_url, headers=headers, json=data, proxies=proxies
     )
     response.raise_for_status()
     return response.json()
 
 
+_SCHEMA_SKIP_KEYS = frozenset(("last_edited_at", "last_edited_class_at"))
+
+
 def get_item_ids(schema):
     """Returns a dictionary in the format: {'field/class name': 'ID'}"""
-    items = {}
-    for key, value in schema.items():
-        if key not in ["last_edited_at", "last_edited_class_at"]:
-            name = value["name"]
-            items[name] = key
-    return items
-
-
-def run_prompt_udf(project_id, token, target_url, validation_id, proxies=None):
-    """Generates code for a prompt UDF"""
-    url = f"{target_url}/api/v2/aihub/build/projects/{project_id}/validations/{validation_id}/examples"
-    headers = with_instabase_certificate({"Authorization": f"Bearer {token}"})
-    response = requests.put(url=url, headers=headers, proxies=proxies)
-    response.raise_for_status()
-    time.sleep(10)
+    return {
+        value["name"]: key
+        for key, value in schema.items()
+        if key not in _SCHEMA_SKIP_KEYS
+    }
 
-    url = f"{target_url}/api/v2/aihub/build/projects/{project_id}/validations/{validation_id}/code-generation"
-    headers = with_instabase_certificate({"Authorization": f"Bearer {token}"})
-    response = requests.put(url=url, headers=headers, proxies=proxies)
+
+def run_prompt_udf(
+    project_id, token, target_url, validation_id, proxies=None, timeout=30
+):
+    """
+    Generates code for a prompt UDF
+
+    The examples run and the code is generated in the background, so each request is
+    followed by PROMPT_UDF_SETTLE_WAIT seconds. Code generation fails until the examples
+    are ready, so it is also retried with exponential backoff (0.2s doubling up to 2s)
+    until it succeeds or `timeout` seconds pass.
+    """
+    base_url = f"{_projects_url(target_url)}/{project_id}/validations/{validation_id}"
+    headers = _headers(token)
+    invalidate_response_cache(project_id)
+    response = _SESSION.put(
+        url=f"{base_url}/examples", headers=headers, proxies=proxies
+    )
+    response.raise_for_status()
+    time.sleep(PROMPT_UDF_SETTLE_WAIT)
+
+    deadline = time.monotonic() + timeout
+    delay = 0.2
+    while True:
+        try:
+            response = _POLL_SESSION.put(
+                url=f"{base_url}/code-generation",
+                headers=headers,
+                proxies=proxies,
+                timeout=max(deadline - time.monotonic(), delay),
+            )
+        except (requests.ConnectionError, requests.Timeout):
+            if time.monotonic() + delay > deadline:
+                raise
+        else:
+            if response.ok or time.monotonic() + delay > deadline:
+                break
+        time.sleep(delay)
+        delay = min(delay * 2, 2.0)
     response.raise_for_status()
-    time.sleep(10)
+    time.sleep(PROMPT_UDF_SETTLE_WAIT)
     return response.json()
 
 
-def modify_udf_lines(field_schema, project_id, token, target_url, udfs, proxies=None):
-    for line in field_schema["lines"]:
-        if line["line_type"] == "UDF":
-            function_id = line["function_id"]
-            result = post_udf(
-                project_id, token, target_url, udfs[str(function_id)], proxies=proxies
-            )
-            line["function_id"] = result["udf_id"]
+def collect_udf_ids(source_schema):
+    """Returns the ids of every UDF used by a line of the schema"""
+    return {
+        str(line["function_id"])
+        for class_id, class_schema in source_schema.items()
+        if class_id not in _SCHEMA_SKIP_KEYS
+        for field_id, field_schema in class_schema["fields"].items()
+        if field_id not in _SCHEMA_SKIP_KEYS
+        for line in field_schema["lines"]
+        if line["line_type"] == "UDF"
+    }
+
+
+def modify_udf_lines(field_schema, id_map):
+    """
+    Point the UDF lines of a field at the new UDF ids
+        Args:
+            field_schema: copy of the source field, its lines are replaced
+            id_map: {source function id: new udf id}
+    """
+    # The lines are rebuilt rather than updated so the source schema is left untouched
+    field_schema["lines"] = [
+        (
+            {**line, "function_id": id_map[str(line["function_id"])]}
+            if line["line_type"] == "UDF"
+            else line
+        )
+        for line in field_schema["lines"]
+    ]
 
 
 def modify_schema(
-    target_schema, source_schema, project_id, token, target_url, udfs, proxies=None
+    target_schema,
+    source_schema,
+    project_id,
+    token,
+    target_url,
+    udfs,
+    proxies=None,
+    udf_cache=None,
 ):
     """
     Function to create the payload
@@ -263,6 +518,16 @@ def modify_schema(
         Returns:
             Payload Dictionary
     """
+    if udf_cache is None:
+        udf_cache = {}
+
+    # Post every UDF the schema uses once up front, the traversal below only rewrites ids
+    pending = {
+        function_id: udfs[function_id]
+        for function_id in collect_udf_ids(source_schema)
+        if function_id not in udf_cache
+    }
+    udf_cache.update(post_udfs(project_id, token, target_url, pending, proxies=proxies))
 
     # Get the names and IDs of the classes in source and target schemas
     source_classes = get_item_ids(source_schema)
@@ -277,83 +542,94 @@ def modify_schema(
         source_fields = get_item_ids(source_class_schema["fields"])
         source_fields_schema = source_class_schema["fields"]
 
+        # Copy the source fields once, whether they are added or updated in the target
+        prepared_fields = {
+            field_name: source_fields_schema[source_field_id].copy()
+            for field_name, source_field_id in source_fields.items()
+        }
+        for field_schema in prepared_fields.values():
+            modify_udf_lines(field_schema, udf_cache)
+
+        # Get the names and ids of the existing fields in target env, a new class has none
+        # 'DEFAULT_CLASS_NAME' if class_name == 'Other' else
+        target_class_id = target_classes.get(class_name)  # or class_name == 'Other'
+        target_fields = (
+            get_item_ids(target_schema[target_class_id]["fields"])
+            if target_class_id is not None
+            else {}
+        )
+
+        # Identify if the field already exists or requires to be added
+        fields, new_fields = {}, []
+        for field_name, field_schema in prepared_fields.items():
+            if field_name in target_fields:
+                fields[target_fields[field_name]] = field_schema
+            else:
+                field_schema["uuid"] = generate_id()
+                new_fields.append(field_schema)
+
+        # Set the schema from source class and updated fields
         class_schema = {
             "name": source_class_schema["name"],
             "description": source_class_schema["description"],
-            "fields": {},
-            "new_fields": [],
+            "fields": fields,
+            "new_fields": new_fields,
         }
+        if target_class_id is not None:
+            classes[target_class_id] = class_schema
+        else:
+            new_classes.append(class_schema)
 
-        if class_name in target_classes:  # or class_name == 'Other':
-            # Get the names and ids of the existing fields in target env
-            # 'DEFAULT_CLASS_NAME' if class_name == 'Other' else
-            target_class_id = target_classes[class_name]
-            target_class_schema = target_schema[target_class_id]
-            target_fields = get_item_ids(target_class_schema["fields"])
+    return {"classes": classes, "new_classes": new_classes}
 
-            # Identify if the field already exists or requires to be added
-            fields, new_fields = {}, []
 
-            for field_name, source_field_id in source_fields.items():
-                # Get the source field schema
-                source_field_schema = source_fields_schema[source_field_id]
+def schema_digest(source_schema, udfs):
+    """Return a content hash of the source schema and the UDFs it uses"""
+    # stdlib json with sorted keys keeps the digest stable whether or not orjson is installed
+    canonical = json.dumps([source_schema, udfs], sort_keys=True).encode()
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
 
-                field_schema = source_field_schema.copy()
 
-                if field_name in target_fields:
-                    # Get the target field id
-                    target_field_id = target_fields[field_name]
-                    # Add the new schema to target
-                    modify_udf_lines(
-                        field_schema,
-                        project_id,
-                        token,
-                        target_url,
-                        udfs,
-                        proxies=proxies,
-                    )
-                    fields[target_field_id] = field_schema
-                else:
-                    modify_udf_lines(
-                        field_schema,
-                        project_id,
-                        token,
-                        target_url,
-                        udfs,
-                        proxies=proxies,
-                    )
-                    field_schema["uuid"] = generate_id()
-                    new_fields.append(field_schema)
+def _schema_marker_path(project_id, target_url):
+    cache_dir = os.environ.get(
+        "IB_CICD_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ib_cicd")
+    )
+    key = hashlib.blake2b(
+        f"{target_url}|{project_id}".encode(), digest_size=16
+    ).hexdigest()
+    return os.path.join(cache_dir, "schema_hash", key)
 
-            # Set the schema from source class and updated fields
-            class_schema["fields"] = fields
-            class_schema["new_fields"] = new_fields
-            classes[target_class_id] = class_schema
-        else:
-            # Add all the fields under new_fields
-            new_fields = []
-
-            for field_name in source_fields:
-                # Get the source field schema
-                source_field_id = source_fields[field_name]
-                source_field_schema = source_fields_schema[source_field_id]
-
-                field_schema = source_field_schema.copy()
-                modify_udf_lines(
-                    field_schema, project_id, token, target_url, udfs, proxies=proxies
-                )
-                field_schema["uuid"] = generate_id()
-                new_fields.append(field_schema)
 
-            class_schema["new_fields"] = new_fields
-            new_classes.append(class_schema)
+def is_schema_synced(source_schema, udfs, project_id, target_url):
+    """
+    Check if the source schema was already posted to the target project unchanged
+        Args:
+            source_schema: the source schema
+            udfs: the sanitized source udfs
+            project_id: the target build project id
+            target_url: the environment the target project is in
+        Returns:
+            True if the last recorded sync has the same digest
+    """
+    try:
+        with open(_schema_marker_path(project_id, target_url)) as f:
+            return f.read().strip() == schema_digest(source_schema, udfs)
+    except OSError:
+        return False
 
-    return {"classes": classes, "new_classes": new_classes}
+
+def record_schema_sync(source_schema, udfs, project_id, target_url):
+    """Record the digest of a schema that was posted to the target project"""
+    marker_path = _schema_marker_path(project_id, target_url)
+    os.makedirs(os.path.dirname(marker_path), exist_ok=True)
+    with open(marker_path, "w") as f:
+        f.write(schema_digest(source_schema, udfs))
 
 
 #### Functions for validations ####
 
 
+@_cache_response
 def get_validations(project_id, token, host_url, proxies=None):
     """
     Return the validations response
@@ -365,13 +641,11 @@ def get_validations(project_id, token, host_url, proxies=None):
             schema response
     """
 
-    get_validations_url = (
-        f"{host_url}/api/v2/aihub/build/projects/{project_id}/validations"
-    )
-    headers = with_instabase_certificate({"Authorization": f"Bearer {token}"})
-    response = requests.get(url=get_validations_url, headers=headers, proxies=proxies)
+    get_validations_url = f"{_projects_url(host_url)}/{project_id}/validations"
+    headers = _headers(token)
+    response = _SESSION.get(url=get_validations_url, headers=headers, proxies=proxies)
     response.raise_for_status()  # This will raise an error
-    return response.json()
+    return _loads(response.content)
 
 
 def post_validations(project_id, token, target_url, data, proxies=None):
@@ -385,9 +659,10 @@ def post_validations(project_id, token, target_url, data, proxies=None):
         Return:
             json response
     """
-    post_udfs_url = f"{target_url}/api/v2/aihub/build/projects/{project_id}/validations"
-    headers = with_instabase_certificate({"Authorization": f"Bearer {token}"})
-    response = requests.post(
+    post_udfs_url = f"{_projects_url(target_url)}/{project_id}/validations"
+    headers = _headers(token)
+    invalidate_response_cache(project_id)
+    response = _SESSION.post(
         url=post_udfs_url, headers=headers, json=data, proxies=proxies
     )
     response.raise_for_status()
@@ -398,11 +673,10 @@ def delete_validations(project_id, token, target_url, id, proxies=None):
     """
     Delete a particular validation
     """
-    delete_url = (
-        f"{target_url}/api/v2/aihub/build/projects/{project_id}/validations?id={id}"
-    )
-    headers = with_instabase_certificate({"Authorization": f"Bearer {token}"})
-    response = requests.delete(url=delete_url, headers=headers, proxies=proxies)
+    delete_url = f"{_projects_url(target_url)}/{project_id}/validations?id={id}"
+    headers = _headers(token)
+    invalidate_response_cache(project_id)
+    response = _SESSION.delete(url=delete_url, headers=headers, proxies=proxies)
     response.raise_for_status()
     return response
 
@@ -417,16 +691,6 @@ def update_fields_with_mapping(fields, mappings):
     return result
 
 
-def get_item_ids(schema):
-    """Returns a dictionary in the format: {'field/class name': 'ID'}"""
-    items = {}
-    for key, value in schema.items():
-        if key not in ["last_edited_at", "last_edited_class_at"]:
-            name = value["name"]
-            items[name] = key
-    return items
-
-
 def map_field_ids(old_schema, new_schema):
     """
     Maps old schema field IDs to new schema field IDs based on matching names.
@@ -465,6 +729,7 @@ def modify_validations(
     udfs,
     mappings,
     proxies=None,
+    udf_cache=None,
 ):
     """
     Function to create the payload for validations
@@ -474,14 +739,16 @@ def modify_validations(
         Returns:
             Payload Dictionary
     """
+    if udf_cache is None:
+        udf_cache = {}
 
     # to find if the validation is already present
     names = {}
     for rule in target_validations["rules"]:
         names[rule.get("name")] = rule.get("id")
 
-    # Convert the data to payloads
-    payloads = []
+    # Convert the data to payloads, UDFs are posted once all payloads are built
+    payloads, udf_payloads = [], []
     for rule in source_validations["rules"]:
         if rule.get("name") in names.keys():
             response = delete_validations(
@@ -510,19 +777,31 @@ def modify_validations(
             )
 
         if rule.get("type") == "UDF" or rule.get("type") == "PROMPT_UDF":
-            id = rule["params"]["udf_id"]
-            response = post_udf(
-                project_id, token, target_url, udfs[str(id)], proxies=proxies
-            )
-            new_id = response["udf_id"]
+            udf_payloads.append((payload, str(rule["params"]["udf_id"])))
 
-            headers = {"Authorization": f"Bearer {token}"}
-            examples_url = f"{target_url}/api/v2/aihub/build/projects/{project_id}/validations/{new_id}/examples"
-            resp = requests.put(examples_url, headers=headers, proxies=proxies)
-            print(f"Run Examples {new_id}: {resp.text}")
+        payloads.append(payload)
 
-            payload["params"]["udf_id"] = int(new_id)
+    # Post the UDFs that haven't been created yet in one wave
+    pending = {id: udfs[id] for _, id in udf_payloads if id not in udf_cache}
+    new_ids = post_udfs(project_id, token, target_url, pending, proxies=proxies)
+    udf_cache.update(new_ids)
+
+    # Then run the examples of every UDF the rules use in a second wave, including
+    # ones taken from udf_cache, e.g. already posted by the schema sync
+    headers = _headers(token)
+    used_ids = list(dict.fromkeys(udf_cache[id] for _, id in udf_payloads))
+    examples_responses = _UDF_EXECUTOR.map(
+        lambda new_id: _SESSION.put(
+            f"{_projects_url(target_url)}/{project_id}/validations/{new_id}/examples",
+            headers=headers,
+            proxies=proxies,
+        ),
+        used_ids,
+    )
+    for new_id, resp in zip(used_ids, examples_responses):
+        print(f"Run Examples {new_id}: {resp.text}")
 
-        payloads.append(payload)
+    for payload, id in udf_payloads:
+        payload["params"]["udf_id"] = int(udf_cache[id])
 
     return payloads
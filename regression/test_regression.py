@@ -1,23 +1,19 @@
 import unittest
 import os
 import logging
+import logging.handlers
+import queue
 from datetime import datetime
 from ib_cicd.promote_build_solution import main as promote_build_main
 from ib_cicd.promote_solution import main as promote_solution_main
-import shutil
 import json
+import tempfile
+from unittest.mock import patch
 
 
 class TestRegressionSuite(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        # Configure logging
-        logging.basicConfig(
-            filename=f'regression_test_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log',
-            level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(message)s",
-        )
-
         # Verify required environment variables
         required_vars = [
             "SOURCE_HOST_URL",
@@ -32,22 +28,30 @@ class TestRegressionSuite(unittest.TestCase):
                 f"Missing required environment variables: {', '.join(missing_vars)}"
             )
 
+        # Configure logging, records are written to the file from a background thread
+        file_handler = logging.FileHandler(
+            f'regression_test_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+        )
+        file_handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+        )
+        log_queue = queue.Queue(-1)
+        cls._queue_handler = logging.handlers.QueueHandler(log_queue)
+        cls._log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+        cls._log_listener.start()
+        root_logger = logging.getLogger()
+        root_logger.addHandler(cls._queue_handler)
+        root_logger.setLevel(logging.INFO)
+
         # Create test configs directory if it doesn't exist
         os.makedirs("regression/configs", exist_ok=True)
 
-    def setUp(self):
-        """Set up test environment before each test"""
-        # Backup existing config if it exists
-        if os.path.exists("config.json"):
-            shutil.copy("config.json", "config.json.backup")
-
-    def tearDown(self):
-        """Clean up after each test"""
-        # Restore original config if it existed
-        if os.path.exists("config.json.backup"):
-            shutil.move("config.json.backup", "config.json")
-        elif os.path.exists("config.json"):
-            os.remove("config.json")
+    @classmethod
+    def tearDownClass(cls):
+        logging.getLogger().removeHandler(cls._queue_handler)
+        cls._log_listener.stop()
+        for handler in cls._log_listener.handlers:
+            handler.close()
 
     def _setup_config(self, config_file):
         """Helper method to set up configuration for each test"""
@@ -55,16 +59,27 @@ class TestRegressionSuite(unittest.TestCase):
         if not os.path.exists(config_path):
             raise FileNotFoundError(f"Configuration file {config_file} not found")
 
-        shutil.copy(config_path, "config.json")
-
         with open(config_path) as f:
-            return json.load(f)
+            config = json.load(f)
+
+        # Each test gets its own copy (the promote steps write ids back into it) and the
+        # promote mains find it through IB_CICD_CONFIG instead of a shared config.json
+        config_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(config_dir.cleanup)
+        test_config_path = os.path.join(config_dir.name, "config.json")
+        with open(test_config_path, "w") as f:
+            json.dump(config, f)
+
+        env_patcher = patch.dict(os.environ, {"IB_CICD_CONFIG": test_config_path})
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+        return config
 
     def test_build_flow_migration(self):
         """Test end-to-end migration of a build flow solution"""
         config = self._setup_config("build_solution_config.json")
         logging.info(
-            f"Starting build flow migration test with config: {json.dumps(config, indent=2)}"
+            f"Starting build flow migration test with config: {json.dumps(config, separators=(',', ':'))}"
         )
 
         try:
@@ -91,7 +106,7 @@ class TestRegressionSuite(unittest.TestCase):
         """Test end-to-end migration of a normal flow solution"""
         config = self._setup_config("normal_flow_config.json")
         logging.info(
-            f"Starting normal flow migration test with config: {json.dumps(config, indent=2)}"
+            f"Starting normal flow migration test with config: {json.dumps(config, separators=(',', ':'))}"
         )
 
         try:
@@ -0,0 +1,49 @@
+import json as _json
+
+import pytest
+import requests
+import requests_mock
+
+from ib_cicd import rebuild_utils
+from tests.fixtures import FakeResponse
+
+
+@pytest.fixture(autouse=True)
+def rmock(monkeypatch):
+    """Fixture giving rebuild_utils a fresh session served by a requests-mock adapter.
+
+    The module's shared sessions are swapped for the test, so no rebuild_utils call
+    can reach the network and no pooled state leaks between tests.
+
+    Yields:
+        requests_mock.Mocker: Register responses with rmock.get/post/... and
+            inspect rmock.last_request / rmock.call_count afterwards.
+    """
+    session = requests.Session()
+    monkeypatch.setattr(rebuild_utils, "_SESSION", session)
+    monkeypatch.setattr(rebuild_utils, "_POLL_SESSION", session)
+    with requests_mock.Mocker(session=session) as m:
+        yield m
+
+
+@pytest.fixture(scope="module")
+def make_response():
+    """Fixture providing a builder for FakeResponse objects.
+
+    Returns:
+        callable: Builds a FakeResponse from ``json`` or ``text``; the body is
+            encoded into ``content`` so both .json() and .content agree.
+    """
+
+    def _make(json=None, text=None, status_code=200, headers=None):
+        if text is not None:
+            content = text.encode()
+        elif json is not None:
+            content = _json.dumps(json).encode()
+        else:
+            content = b""
+        return FakeResponse(
+            status_code=status_code, content=content, headers=headers or {}
+        )
+
+    return _make
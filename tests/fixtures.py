@@ -1,4 +1,9 @@
+import json as _json
+from dataclasses import dataclass, field
+from typing import Any
+
 import pytest
+import requests
 
 
 @pytest.fixture
@@ -24,3 +29,55 @@ def mock_config():
             "workspace": "target_workspace",
         },
     }
+
+
+class HeadersWith:
+    """Matcher for assert_called_with: equal to any headers dict holding these items.
+
+    Pass dashed header names by unpacking a dict: HeadersWith(**{"Ib-Context": "org"}).
+    """
+
+    def __init__(self, **items):
+        self.items = items
+
+    def __eq__(self, other):
+        return all(other.get(key) == value for key, value in self.items.items())
+
+    def __repr__(self):
+        return f"HeadersWith({self.items!r})"
+
+
+@dataclass
+class FakeResponse:
+    """Minimal stand-in for requests.Response used as a mocked session return value.
+
+    json() returns json_data when given, otherwise decodes content.
+    """
+
+    status_code: int = 200
+    content: bytes = b""
+    json_data: Any = None
+    headers: dict = field(default_factory=dict)
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode()
+
+    def json(self):
+        if self.json_data is not None:
+            return self.json_data
+        return _json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} Error", response=self
+            )
+
+    def iter_content(self, chunk_size=1):
+        for offset in range(0, len(self.content), chunk_size):
+            yield self.content[offset : offset + chunk_size]
@@ -1,18 +1,27 @@
+import asyncio
+import base64
 import json
+import os
+import tempfile
 import unittest
-from unittest.mock import patch, Mock, MagicMock
+from unittest.mock import ANY, MagicMock, call, patch
+import pytest
 import requests
 
 from ib_cicd.ib_helpers import (
+    _SESSION,
+    _tls_verify,
     upload_chunks,
     upload_file,
     read_file_through_api,
     publish_to_marketplace,
     make_api_request,
+    make_api_request_async,
     check_job_status,
     check_job_status_build,
     unzip_files,
     compile_solution,
+    clear_file_content_cache,
     copy_file_within_ib,
     create_folder_if_it_does_not_exists,
     list_directory,
@@ -21,123 +30,200 @@ from ib_cicd.ib_helpers import (
     generate_flow,
     read_file_content_from_ib,
     wait_until_job_finishes,
+    wait_for_completion,
     delete_app,
     get_app_details,
     get_deployment_details,
 )
+from tests.fixtures import FakeResponse
+
+
+@pytest.mark.parametrize(
+    "helper, args, verb, status",
+    [
+        (
+            upload_chunks,
+            ("https://example.com", "path", "token", b"data"),
+            "patch",
+            204,
+        ),
+        (upload_file, ("https://example.com", "token", "path", b"data"), "put", 204),
+        (read_file_through_api, ("https://example.com", "token", "path"), "get", 200),
+        (publish_to_marketplace, ("https://example.com", "token", "path"), "post", 200),
+        (
+            check_job_status,
+            ("https://example.com", "job_id", "flow", "token"),
+            "get",
+            200,
+        ),
+        (delete_app, ("https://example.com", "token", "app_id", "org"), "delete", 204),
+    ],
+)
+def test_helper_returns_response(helper, args, verb, status, monkeypatch):
+    mock = MagicMock(return_value=FakeResponse(status, b'{"status": "OK"}'))
+    monkeypatch.setattr(_SESSION, verb, mock)
+
+    assert helper(*args).status_code == status
+    mock.assert_called_once()
 
 
 class TestIBHelpers(unittest.TestCase):
-    @patch("requests.patch")
-    def test_upload_chunks(self, mock_patch):
-        mock_patch.return_value.status_code = 204
-        response = upload_chunks("https://example.com", "path", "token", b"data")
-        self.assertEqual(response.status_code, 204)
-
-    @patch("requests.put")
-    def test_upload_file(self, mock_put):
-        mock_put.return_value.status_code = 204
-        response = upload_file("https://example.com", "token", "path", b"data")
-        self.assertEqual(response.status_code, 204)
-
-    @patch("requests.get")
-    def test_read_file_through_api(self, mock_get):
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = b"file content"
-        response = read_file_through_api("https://example.com", "token", "path")
-        self.assertEqual(response.status_code, 200)
+    def setUp(self):
+        clear_file_content_cache()
+        # One mock per HTTP verb on the shared session; tests configure the
+        # return values they need instead of re-patching every method.
+        for verb in ("get", "post", "put", "patch", "head", "delete"):
+            patcher = patch.object(_SESSION, verb)
+            setattr(self, f"mock_{verb}", patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def test_session_is_pooled_and_retries_gateway_errors(self):
+        adapter = _SESSION.get_adapter("https://example.com")
+        self.assertIs(adapter, _SESSION.get_adapter("http://example.com"))
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertEqual(set(adapter.max_retries.status_forcelist), {502, 503, 504})
+
+    def test_session_verification_is_configured_once(self):
+        self.assertIs(_SESSION.verify, True)
+        self.mock_post.return_value = FakeResponse(202)
+
+        unzip_files("http://test-url", "api-token", "test.zip", "test-destination")
+
+        self.assertNotIn("verify", self.mock_post.call_args.kwargs)
+
+    def test_tls_verification_defaults_on_with_explicit_opt_out(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIs(_tls_verify(), True)
+        with patch.dict(os.environ, {"IB_CA_BUNDLE": "/etc/ib-ca.pem"}, clear=True):
+            self.assertEqual(_tls_verify(), "/etc/ib-ca.pem")
+        with patch.dict(os.environ, {"IB_SKIP_TLS_VERIFY": "1"}, clear=True):
+            self.assertIs(_tls_verify(), False)
+
+    def test_helpers_share_the_module_session(self):
+        self.mock_get.return_value = FakeResponse(200, b"file content")
+        self.mock_put.return_value = FakeResponse(204)
+
+        read_file_through_api("https://example.com", "token", "path")
+        upload_file("https://example.com", "token", "path", b"data")
+
+        self.mock_get.assert_called_once()
+        self.mock_put.assert_called_once()
+
+    def test_upload_chunks_appends_in_order(self):
+        self.mock_patch.return_value = FakeResponse(204)
+        data = bytes(range(256)) * 4096 * 3
+
+        upload_chunks("https://example.com", "path", "token", data, chunk_size=1 << 20)
+
+        calls = self.mock_patch.call_args_list
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(
+            [c.kwargs["headers"]["IB-Cursor"] for c in calls], ["0", "-1", "-1"]
+        )
+        self.assertEqual(b"".join(bytes(c.kwargs["data"]) for c in calls), data)
 
-    @patch("requests.post")
-    def test_publish_to_marketplace(self, mock_post):
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {"status": "success"}
-        response = publish_to_marketplace("https://example.com", "token", "path")
-        self.assertEqual(response.status_code, 200)
+    def test_upload_chunks_stops_on_failed_chunk(self):
+        ok = FakeResponse(204)
+        failed = FakeResponse(500, b"boom")
+        self.mock_patch.side_effect = [ok, failed, ok]
+
+        with self.assertRaises(Exception) as context:
+            upload_chunks("https://example.com", "path", "token", b"abc", chunk_size=1)
+
+        self.assertIn("Upload failed", str(context.exception))
+        self.assertEqual(self.mock_patch.call_count, 2)
+
+    def test_upload_chunks_empty_data(self):
+        self.mock_patch.return_value = FakeResponse(204)
+
+        upload_chunks("https://example.com", "path", "token", b"")
+
+        self.mock_patch.assert_called_once()
+        self.assertEqual(bytes(self.mock_patch.call_args.kwargs["data"]), b"")
 
-    @patch("requests.get")
-    @patch("requests.post")
-    def test_make_api_request(self, mock_post, mock_get):
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.json.return_value = {"data": "success"}
+    def test_make_api_request(self):
+        self.mock_get.return_value = FakeResponse(json_data={"data": "success"})
         response = make_api_request("https://example.com", "token", method="get")
         self.assertEqual(response["data"], "success")
 
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {"data": "posted"}
+        self.mock_post.return_value = FakeResponse(json_data={"data": "posted"})
         response = make_api_request(
             "https://example.com", "token", method="post", payload={"key": "value"}
         )
         self.assertEqual(response["data"], "posted")
 
-    @patch("requests.get")
-    def test_check_job_status(self, mock_get):
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = json.dumps({"status": "completed"}).encode()
-        response = check_job_status("https://example.com", "job_id", "flow", "token")
-        self.assertEqual(response.status_code, 200)
+    def test_make_api_request_async(self):
+        self.mock_get.return_value = FakeResponse(json_data={"data": "success"})
+
+        async def fetch_all():
+            return await asyncio.gather(
+                *(
+                    make_api_request_async(f"https://example.com/{i}", "token")
+                    for i in range(3)
+                )
+            )
+
+        results = asyncio.run(fetch_all())
+
+        self.assertEqual(results, [{"data": "success"}] * 3)
+        self.assertEqual(
+            sorted(c.args[0] for c in self.mock_get.call_args_list),
+            [f"https://example.com/{i}" for i in range(3)],
+        )
 
-    @patch("requests.get")
     @patch("time.sleep", return_value=None)
-    def test_check_job_status_build_success(self, mock_sleep, mock_get):
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "state": "DONE",
-            "results": [{"deployed_solution_id": "12345"}],
-        }
-        mock_get.return_value = mock_response
+    def test_check_job_status_build_success(self, mock_sleep):
+        self.mock_get.return_value = FakeResponse(
+            json_data={"state": "DONE", "results": [{"deployed_solution_id": "12345"}]}
+        )
 
         result = check_job_status_build("http://test-url", "api-token", "job-id")
 
         self.assertEqual(result, "12345")
-        mock_get.assert_called_with(
+        self.mock_get.assert_called_with(
             "http://test-url/api/v1/jobs/status?job_id=job-id&type=async",
             headers={
                 "Authorization": "Bearer api-token",
-                "IB-Certificate": Any,
+                "IB-Certificate": ANY,
             },
-            verify=True,
+            proxies=None,
         )
 
-    @patch("requests.post")
-    def test_unzip_files_success(self, mock_post):
-        mock_response = Mock()
-        mock_response.status_code = 202
-        mock_post.return_value = mock_response
+    def test_unzip_files_success(self):
+        mock_response = FakeResponse(202)
+        self.mock_post.return_value = mock_response
 
         resp = unzip_files(
             "http://test-url", "api-token", "test.zip", "test-destination"
         )
 
-        self.assertEqual(resp, mock_response)
-        mock_post.assert_called_with(
+        self.assertIs(resp, mock_response)
+        self.mock_post.assert_called_with(
             "http://test-url/api/v2/files/extract",
-            headers={"Authorization": "Bearer api-token"},
-            data=json.dumps({"src_path": "test.zip", "dst_path": "test-destination"}),
-            verify=False,
+            headers={"Authorization": "Bearer api-token", "IB-Certificate": ANY},
+            data=ANY,
+            proxies=None,
+        )
+        self.assertEqual(
+            json.loads(self.mock_post.call_args.kwargs["data"]),
+            {"src_path": "test.zip", "dst_path": "test-destination"},
         )
 
-    @patch("requests.post")
-    def test_compile_solution_success(self, mock_post):
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"status": "SUCCESS"}
-        mock_response.content = json.dumps({"status": "SUCCESS"}).encode()
-        mock_post.return_value = mock_response
+    def test_compile_solution_success(self):
+        mock_response = FakeResponse(200, b'{"status": "SUCCESS"}')
+        self.mock_post.return_value = mock_response
 
         response = compile_solution(
             "http://test-url", "api-token", "solution-path", "relative-path.ibflow"
         )
 
-        self.assertEqual(response, mock_response)
-        mock_post.assert_called_once()
+        self.assertIs(response, mock_response)
+        self.mock_post.assert_called_once()
 
-    @patch("requests.post")
-    def test_copy_file_within_ib_api(self, mock_post):
+    def test_copy_file_within_ib_api(self):
         # Setup mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 202
-        mock_post.return_value = mock_response
+        self.mock_post.return_value = FakeResponse(202)
 
         # Call the function
         response = copy_file_within_ib(
@@ -150,24 +236,17 @@ class TestIBHelpers(unittest.TestCase):
 
         # Assertions
         self.assertEqual(response.status_code, 202)
-        called_args, called_kwargs = mock_post.call_args
+        called_args, called_kwargs = self.mock_post.call_args
         self.assertEqual(called_args[0], "http://test.com/api/v2/files/copy")
         self.assertEqual(
             called_kwargs["headers"].get("Authorization"), "Bearer fake_token"
         )
         self.assertIn("IB-Certificate", called_kwargs["headers"])
 
-    @patch("requests.post")
-    @patch("requests.head")
-    def test_create_folder_if_it_does_not_exists(self, mock_head, mock_post):
+    def test_create_folder_if_it_does_not_exists(self):
         # Setup mock responses
-        mock_head_response = MagicMock()
-        mock_head_response.status_code = 404
-        mock_head.return_value = mock_head_response
-
-        mock_post_response = MagicMock()
-        mock_post_response.status_code = 201
-        mock_post.return_value = mock_post_response
+        self.mock_head.return_value = FakeResponse(404)
+        self.mock_post.return_value = FakeResponse(201)
 
         # Call the function
         response = create_folder_if_it_does_not_exists(
@@ -176,85 +255,102 @@ class TestIBHelpers(unittest.TestCase):
 
         # Assertions
         self.assertEqual(response.status_code, 201)
-        mock_head.assert_called_once_with(
+        self.mock_head.assert_called_once_with(
             "/path/to/folder",
             headers={
                 "Authorization": "Bearer fake_token",
-                "IB-Certificate": Any,
+                "IB-Certificate": ANY,
             },
-            verify=False,
+            proxies=None,
         )
-        mock_post.assert_called_once_with(
+        self.mock_post.assert_called_once_with(
             "/path/to",
             headers={
                 "Authorization": "Bearer fake_token",
-                "IB-Certificate": Any,
+                "IB-Certificate": ANY,
             },
-            data=json.dumps({"name": "folder", "node_type": "folder"}),
-            verify=False,
+            data=ANY,
+            proxies=None,
+        )
+        self.assertEqual(
+            json.loads(self.mock_post.call_args.kwargs["data"]),
+            {"name": "folder", "node_type": "folder"},
         )
 
-    @patch("requests.get")
-    def test_list_directory(self, mock_get):
+    def test_list_directory(self):
         # Setup mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.content = json.dumps(
-            {
-                "nodes": [
-                    {"full_path": "/path/to/file1"},
-                    {"full_path": "/path/to/file2"},
-                ],
-                "has_more": False,
-                "next_page_token": None,
-            }
+        self.mock_get.return_value = FakeResponse(
+            content=json.dumps(
+                {
+                    "nodes": [
+                        {"full_path": "/path/to/file1"},
+                        {"full_path": "/path/to/file2"},
+                    ],
+                    "has_more": False,
+                    "next_page_token": None,
+                }
+            ).encode()
         )
-        mock_get.return_value = mock_response
 
         # Call the function
         paths = list_directory("http://test.com", "/folder", "fake_token")
 
         # Assertions
         self.assertEqual(paths, ["/path/to/file1", "/path/to/file2"])
-        mock_get.assert_called_once_with(
+        self.mock_get.assert_called_once_with(
             "/folder",
             headers={
                 "Authorization": "Bearer fake_token",
-                "IB-Certificate": Any,
+                "IB-Certificate": ANY,
             },
             params={"expect-node-type": "folder", "start-token": None},
+            proxies=None,
+        )
+
+    def test_list_directory_follows_pages(self):
+        pages = []
+        for page, token in enumerate(["t1", "t2", None]):
+            body = {
+                "nodes": [{"full_path": f"/folder/{page}-{i}"} for i in range(1000)],
+                "has_more": token is not None,
+                "next_page_token": token,
+            }
+            pages.append(FakeResponse(content=json.dumps(body).encode()))
+        self.mock_get.side_effect = pages
+
+        paths = list_directory(
+            "http://test.com", "/folder", "fake_token", page_size=1000
         )
 
-    @patch("requests.head")
-    def test_get_file_metadata(self, mock_head):
+        self.assertEqual(len(paths), 3000)
+        self.assertEqual(paths[1000], "/folder/1-0")
+        self.assertEqual(self.mock_get.call_count, 3)
+        sent = [c.kwargs["params"] for c in self.mock_get.call_args_list]
+        self.assertEqual([p["start-token"] for p in sent], [None, "t1", "t2"])
+        self.assertTrue(all(p["page-size"] == 1000 for p in sent))
+
+    def test_get_file_metadata(self):
         # Setup mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.content = b""
-        mock_head.return_value = mock_response
+        self.mock_head.return_value = FakeResponse(200)
 
         # Call the function
         response = get_file_metadata("http://test.com", "fake_token", "/path/to/file")
 
         # Assertions
         self.assertEqual(response.status_code, 200)
-        mock_head.assert_called_once_with(
+        self.mock_head.assert_called_once_with(
             "/path/to/file",
             headers={
                 "Authorization": "Bearer fake_token",
-                "IB-Retry-Config": json.dumps(
-                    {"retries": 2, "backoff-seconds": 1}
-                ),
-                "IB-Certificate": Any,
+                "IB-Retry-Config": json.dumps({"retries": 2, "backoff-seconds": 1}),
+                "IB-Certificate": ANY,
             },
+            proxies=None,
         )
 
-    @patch("requests.delete")
-    def test_delete_folder_or_file_from_ib(self, mock_delete):
+    def test_delete_folder_or_file_from_ib(self):
         # Setup mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_delete.return_value = mock_response
+        self.mock_delete.return_value = FakeResponse(200)
 
         # Call the function
         delete_folder_or_file_from_ib(
@@ -262,44 +358,40 @@ class TestIBHelpers(unittest.TestCase):
         )
 
         # Assertions
-        mock_delete.assert_called_once_with(
+        self.mock_delete.assert_called_once_with(
             "/path/to/delete",
             headers={
                 "Authorization": "Bearer fake_token",
-                "IB-Certificate": Any,
+                "IB-Certificate": ANY,
             },
-            verify=False,
+            proxies=None,
         )
 
-    @patch("requests.post")
-    def test_generate_flow(self, mock_post):
+    def test_generate_flow(self):
         # Setup mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"status": "success"}
-        mock_post.return_value = mock_response
-
-        # Patch reading image
-        with patch(
-            "builtins.open",
-            new_callable=unittest.mock.mock_open,
-            read_data=b"fake_image_data",
-        ):
+        self.mock_post.return_value = FakeResponse(json_data={"status": "success"})
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            icon_path = os.path.join(tmp_dir, "icon.png")
+            with open(icon_path, "wb") as f:
+                f.write(b"fake_image_data")
             response = generate_flow(
-                "http://test.com", "fake_token", "fake_project_id", "fake_icon_path"
+                "http://test.com",
+                "fake_token",
+                "fake_project_id",
+                "fake_context",
+                icon_path=icon_path,
             )
 
         # Assertions
         self.assertEqual(response["status"], "success")
-        mock_post.assert_called_once()
+        self.mock_post.assert_called_once()
+        sent = json.loads(self.mock_post.call_args.kwargs["data"])
+        self.assertEqual(base64.b64decode(sent["icon"]), b"fake_image_data")
 
-    @patch("requests.get")
-    def test_read_file_content_from_ib_api(self, mock_get):
+    def test_read_file_content_from_ib_api(self):
         # Setup mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.content = b"file_content"
-        mock_get.return_value = mock_response
+        self.mock_get.return_value = FakeResponse(200, b"file_content")
 
         # Call the function
         content = read_file_content_from_ib(
@@ -308,18 +400,49 @@ class TestIBHelpers(unittest.TestCase):
 
         # Assertions
         self.assertEqual(content, b"file_content")
-        mock_get.assert_called_once_with(
+        self.mock_get.assert_called_once_with(
             "/path/to/file",
             headers={
                 "Authorization": "Bearer fake_token",
-                "IB-Certificate": Any,
+                "IB-Certificate": ANY,
             },
             params={"expect-node-type": "file"},
-            verify=False,
+            proxies=None,
+            stream=False,
         )
 
-    @patch("requests.get")
-    def test_read_file_content_from_ib_clients(self, mock_get):
+    def test_read_file_content_from_ib_cached(self):
+        first = FakeResponse(200, b"x", headers={"ETag": '"abc"'})
+        not_modified = FakeResponse(304)
+        self.mock_get.side_effect = [first, not_modified]
+
+        self.assertEqual(
+            read_file_content_from_ib("http://test.com", "fake_token", "/path/to/file"),
+            b"x",
+        )
+        self.assertEqual(
+            read_file_content_from_ib("http://test.com", "fake_token", "/path/to/file"),
+            b"x",
+        )
+
+        first_headers = self.mock_get.call_args_list[0].kwargs["headers"]
+        second_headers = self.mock_get.call_args_list[1].kwargs["headers"]
+        self.assertNotIn("If-None-Match", first_headers)
+        self.assertEqual(second_headers["If-None-Match"], '"abc"')
+
+    def test_read_file_content_from_ib_refreshes_changed_file(self):
+        first = FakeResponse(200, b"old", headers={"ETag": '"v1"'})
+        changed = FakeResponse(200, b"new", headers={"ETag": '"v2"'})
+        self.mock_get.side_effect = [first, changed]
+
+        read_file_content_from_ib("http://test.com", "fake_token", "/path/to/file")
+        content = read_file_content_from_ib(
+            "http://test.com", "fake_token", "/path/to/file"
+        )
+
+        self.assertEqual(content, b"new")
+
+    def test_read_file_content_from_ib_clients(self):
         # Setup mock client response
         clients_mock = MagicMock()
         clients_mock.ibfile.is_file.return_value = True
@@ -351,57 +474,146 @@ class TestIBHelpers(unittest.TestCase):
         clients_mock.get_by_col_name.assert_called_once_with("CLIENTS")
         mock_clients.ibfile.read_file.assert_called_once_with("/path/to/file")
 
-    @patch("requests.get")
-    def test_wait_until_job_finishes_success(self, mock_get):
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = json.dumps(
-            {"status": "OK", "state": "DONE"}
-        ).encode()
+    def test_wait_until_job_finishes_success(self):
+        self.mock_get.return_value = FakeResponse(
+            content=json.dumps({"status": "OK", "state": "DONE"}).encode()
+        )
 
         result = wait_until_job_finishes(
             "https://example.com", "job_id", "flow", "token"
         )
         self.assertTrue(result)
 
-    @patch("requests.get")
-    def test_wait_until_job_finishes_failure(self, mock_get):
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = json.dumps({"status": "ERROR"}).encode()
+    def test_wait_until_job_finishes_failure(self):
+        self.mock_get.return_value = FakeResponse(200, b'{"status": "ERROR"}')
 
         with self.assertRaises(Exception) as context:
             wait_until_job_finishes("https://example.com", "job_id", "flow", "token")
 
         self.assertIn("Error checking job status", str(context.exception))
 
-    @patch("requests.delete")
-    def test_delete_app_success(self, mock_delete):
-        mock_delete.return_value.status_code = 204
+    @patch("ib_cicd.ib_helpers.random.uniform", return_value=0.0)
+    @patch("time.sleep", return_value=None)
+    def test_wait_until_job_finishes_backs_off_geometrically(
+        self, mock_sleep, mock_uniform
+    ):
+        running = FakeResponse(
+            content=json.dumps({"status": "OK", "state": "RUNNING"}).encode()
+        )
+        done = FakeResponse(
+            content=json.dumps({"status": "OK", "state": "DONE"}).encode()
+        )
+        self.mock_get.side_effect = [running] * 7 + [done]
+
+        wait_until_job_finishes("https://example.com", "job_id", "flow", "token")
+
+        self.assertEqual(
+            mock_sleep.call_args_list,
+            [call(d) for d in (1.0, 2.0, 4.0, 8.0, 16.0, 30.0, 30.0)],
+        )
+
+    @patch("ib_cicd.ib_helpers.random.uniform", return_value=0.5)
+    @patch("time.sleep", return_value=None)
+    def test_wait_until_job_finishes_retries_rate_limited_polls(
+        self, mock_sleep, mock_uniform
+    ):
+        limited = FakeResponse(429, b"Too Many Requests")
+        done = FakeResponse(
+            content=json.dumps({"status": "OK", "state": "DONE"}).encode()
+        )
+        self.mock_get.side_effect = [limited, limited, limited, done]
+
+        result = wait_until_job_finishes(
+            "https://example.com", "job_id", "flow", "token"
+        )
+
+        self.assertEqual(result["state"], "DONE")
+        self.assertEqual(mock_sleep.call_args_list, [call(1.5), call(3.0), call(6.0)])
+        mock_uniform.assert_called_with(0, 0.5)
+
+    @patch("time.sleep", return_value=None)
+    def test_wait_until_job_finishes_does_not_retry_client_errors(self, mock_sleep):
+        self.mock_get.return_value = FakeResponse(401, b'{"status": "ERROR"}')
+
+        with self.assertRaises(Exception) as context:
+            wait_until_job_finishes("https://example.com", "job_id", "flow", "token")
+
+        self.assertIn("Error checking job status", str(context.exception))
+        mock_sleep.assert_not_called()
+
+    @patch("time.sleep", return_value=None)
+    def test_wait_until_job_finishes_gives_up_on_persistent_gateway_errors(
+        self, mock_sleep
+    ):
+        self.mock_get.return_value = FakeResponse(503, b"Service Unavailable")
+
+        with self.assertRaises(Exception) as context:
+            wait_until_job_finishes("https://example.com", "job_id", "flow", "token")
+
+        self.assertIn("Error checking job status", str(context.exception))
+        self.assertEqual(self.mock_get.call_count, 10)
+        self.assertEqual(mock_sleep.call_count, 9)
+
+    @patch("time.monotonic", side_effect=[0.0, 2.0])
+    @patch("time.sleep", return_value=None)
+    def test_wait_until_job_finishes_respects_deadline(
+        self, mock_sleep, mock_monotonic
+    ):
+        self.mock_get.return_value = FakeResponse(503)
+
+        with self.assertRaises(Exception) as context:
+            wait_until_job_finishes(
+                "https://example.com", "job_id", "flow", "token", deadline=1
+            )
+
+        self.assertIn("Timed out", str(context.exception))
+        mock_sleep.assert_not_called()
+
+    @patch("ib_cicd.ib_helpers.random.uniform", return_value=0.0)
+    @patch("time.sleep", return_value=None)
+    def test_wait_for_completion_backs_off_until_done(self, mock_sleep, mock_uniform):
+        running = FakeResponse(
+            content=json.dumps({"status": "OK", "state": "RUNNING"}).encode()
+        )
+        done = FakeResponse(
+            content=json.dumps({"status": "OK", "state": "DONE"}).encode()
+        )
+        self.mock_get.side_effect = [running, running, done]
+
+        result = wait_for_completion("https://example.com", "token", "job_id")
+
+        self.assertEqual(result["state"], "DONE")
+        self.assertEqual(self.mock_get.call_count, 3)
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        self.assertEqual(delays, [0.25, 0.5])
+        self.assertIn("type=job", self.mock_get.call_args.args[0])
+
+    @patch("time.monotonic", side_effect=[0.0, 61.0])
+    @patch("time.sleep", return_value=None)
+    def test_wait_for_completion_times_out(self, mock_sleep, mock_monotonic):
+        self.mock_get.return_value = FakeResponse(
+            content=json.dumps({"status": "OK", "state": "RUNNING"}).encode()
+        )
+
+        with self.assertRaises(Exception) as context:
+            wait_for_completion("https://example.com", "token", "job_id")
 
-        response = delete_app("https://example.com", "token", "app_id", "org")
-        self.assertEqual(response.status_code, 204)
+        self.assertIn("Timed out", str(context.exception))
 
-    @patch("requests.delete")
-    def test_delete_app_failure(self, mock_delete):
-        mock_response = MagicMock()
-        mock_response.status_code = 404
-        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError()
-        mock_delete.return_value = mock_response
+    def test_delete_app_failure(self):
+        self.mock_delete.return_value = FakeResponse(404)
 
         with self.assertRaises(requests.exceptions.HTTPError):
             delete_app("https://example.com", "token", "app_id", "org")
 
-    @patch("requests.get")
-    def test_get_app_details(self, mock_get):
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.json.return_value = {"app": "details"}
+    def test_get_app_details(self):
+        self.mock_get.return_value = FakeResponse(json_data={"app": "details"})
 
         response = get_app_details("https://example.com", "token", "context", "app_id")
         self.assertEqual(response["app"], "details")
 
-    @patch("requests.get")
-    def test_get_deployment_details(self, mock_get):
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.json.return_value = {"deployment": "details"}
+    def test_get_deployment_details(self):
+        self.mock_get.return_value = FakeResponse(json_data={"deployment": "details"})
 
         response = get_deployment_details(
             "https://example.com", "token", "context", "deployment_id"
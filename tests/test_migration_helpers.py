@@ -1,41 +1,51 @@
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
+import io
 import os
+import tempfile
+import zipfile
 from ib_cicd.migration_helpers import (
     download_solution,
     copy_package_from_marketplace,
     check_if_file_exists_on_ib_env,
+    clear_file_exists_cache,
     copy_marketplace_package_and_move_to_new_env,
     download_dependencies_from_dev_and_upload_to_prod,
     publish_dependencies,
 )
+from tests.fixtures import FakeResponse
 
 
 class TestMigrationHelpers(unittest.TestCase):
+    def setUp(self):
+        clear_file_exists_cache()
+
     @patch("ib_cicd.migration_helpers.read_file_through_api")
-    @patch("builtins.open", new_callable=unittest.mock.mock_open)
-    @patch("ib_cicd.migration_helpers.ZipFile")
-    @patch("os.remove")
-    def test_download_solution(
-        self, mock_remove, mock_zipfile, mock_open, mock_read_api
-    ):
-        mock_resp = MagicMock()
-        mock_resp.content = b"dummy_content"
+    def test_download_solution(self, mock_read_api):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(tmp_dir.name)
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("flow/app.ibflow", "{}")
+        payload = archive.getvalue()
+        mock_resp = FakeResponse(content=payload)
         mock_read_api.return_value = mock_resp
 
         response = download_solution("host", "token", "path")
 
-        self.assertEqual(response, mock_resp)
-        mock_open.assert_called()
-        mock_zipfile.assert_called()
-        mock_remove.assert_called()
+        self.assertIs(response, mock_resp)
+        mock_read_api.assert_called_once_with("host", "token", "path", stream=True)
+        with open("solution.ibflowbin", "rb") as f:
+            self.assertEqual(f.read(), payload)
+        self.assertTrue(os.path.isfile(os.path.join("solution", "flow", "app.ibflow")))
 
-    @patch("ib_cicd.migration_helpers.requests.post")
+    @patch("ib_cicd.migration_helpers._SESSION.post")
     @patch("ib_cicd.migration_helpers.wait_until_job_finishes")
     def test_copy_package_from_marketplace(self, mock_wait, mock_post):
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {"job_id": "1234"}
-        mock_post.return_value = mock_resp
+        mock_post.return_value = FakeResponse(json_data={"job_id": "1234"})
 
         result = copy_package_from_marketplace(
             "host", "token", "package", "1.0", "path"
@@ -43,21 +53,43 @@ class TestMigrationHelpers(unittest.TestCase):
 
         self.assertEqual(result, "path/package-1.0.ibsolution")
         mock_wait.assert_called()
+        # TLS verification is left to the shared session
+        self.assertNotIn("verify", mock_post.call_args.kwargs)
 
     @patch("ib_cicd.migration_helpers.get_file_metadata")
     def test_check_if_file_exists_on_ib_env(self, mock_metadata):
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.headers = {"Content-Length": "100001"}
+        mock_response = FakeResponse(headers={"Content-Length": "100001"})
         mock_metadata.return_value = mock_response
 
         result = check_if_file_exists_on_ib_env("host", "token", "path")
         self.assertTrue(result)
 
+        clear_file_exists_cache()
         mock_response.headers = {"Content-Length": "99999"}
         result = check_if_file_exists_on_ib_env("host", "token", "path")
         self.assertFalse(result)
 
+    @patch("ib_cicd.migration_helpers.get_file_metadata")
+    def test_check_if_file_exists_on_ib_env_cached(self, mock_metadata):
+        mock_metadata.return_value = FakeResponse(headers={"Content-Length": "100001"})
+
+        self.assertTrue(check_if_file_exists_on_ib_env("host", "token", "path"))
+        self.assertTrue(check_if_file_exists_on_ib_env("host", "token", "path"))
+        self.assertEqual(mock_metadata.call_count, 1)
+
+        # A different token or path is checked again
+        check_if_file_exists_on_ib_env("host", "other", "path")
+        check_if_file_exists_on_ib_env("host", "token", "other")
+        self.assertEqual(mock_metadata.call_count, 3)
+
+    @patch("ib_cicd.migration_helpers.get_file_metadata")
+    def test_check_if_file_exists_on_ib_env_rechecks_missing(self, mock_metadata):
+        mock_metadata.return_value = FakeResponse(404)
+
+        self.assertFalse(check_if_file_exists_on_ib_env("host", "token", "path"))
+        self.assertFalse(check_if_file_exists_on_ib_env("host", "token", "path"))
+        self.assertEqual(mock_metadata.call_count, 2)
+
     @patch("ib_cicd.migration_helpers.upload_chunks")
     @patch("ib_cicd.migration_helpers.read_file_content_from_ib")
     @patch("ib_cicd.migration_helpers.copy_package_from_marketplace")
@@ -95,8 +127,11 @@ class TestMigrationHelpers(unittest.TestCase):
     def test_download_dependencies_from_dev_and_upload_to_prod(
         self, mock_copy_package, mock_create_folder
     ):
-        mock_copy_package.side_effect = [(None, "path1"), (None, "path2")]
-        dependency_dict = {"pkg1": "1.0", "pkg2": "2.0"}
+        mock_copy_package.side_effect = lambda src, tgt, name, *args, **kwargs: (
+            None,
+            f"path_{name}",
+        )
+        dependency_dict = {"pkg1": "1.0", "pkg2": "2.0", "pkg3": "3.0"}
 
         result = download_dependencies_from_dev_and_upload_to_prod(
             "src_host",
@@ -108,15 +143,62 @@ class TestMigrationHelpers(unittest.TestCase):
             dependency_dict,
         )
 
-        self.assertEqual(result, ["path1", "path2"])
+        self.assertEqual(result, ["path_pkg1", "path_pkg2", "path_pkg3"])
+
+    @patch("ib_cicd.migration_helpers.create_folder_if_it_does_not_exists")
+    @patch("ib_cicd.migration_helpers.copy_marketplace_package_and_move_to_new_env")
+    def test_download_dependencies_skips_failed_packages(
+        self, mock_copy_package, mock_create_folder
+    ):
+        def copy_package(src, tgt, name, *args, **kwargs):
+            if name == "broken":
+                raise Exception("copy failed")
+            return None, f"path_{name}"
+
+        mock_copy_package.side_effect = copy_package
+        dependency_dict = {"pkg1": "1.0", "broken": "1.0", "pkg2": "2.0"}
+
+        result = download_dependencies_from_dev_and_upload_to_prod(
+            "src_host",
+            "tgt_host",
+            "src_token",
+            "tgt_token",
+            "dwn_folder",
+            "upload_folder",
+            dependency_dict,
+        )
+
+        self.assertEqual(result, ["path_pkg1", "path_pkg2"])
+
+    @patch("ib_cicd.migration_helpers.create_folder_if_it_does_not_exists")
+    @patch("ib_cicd.migration_helpers.copy_marketplace_package_and_move_to_new_env")
+    def test_download_dependencies_with_no_packages(
+        self, mock_copy_package, mock_create_folder
+    ):
+        result = download_dependencies_from_dev_and_upload_to_prod(
+            "src_host",
+            "tgt_host",
+            "src_token",
+            "tgt_token",
+            "dwn_folder",
+            "upload_folder",
+            {},
+        )
+
+        self.assertEqual(result, [])
+        mock_copy_package.assert_not_called()
 
     @patch("ib_cicd.migration_helpers.publish_to_marketplace")
     def test_publish_dependencies(self, mock_publish):
         mock_publish.return_value = "Success"
 
-        publish_dependencies(["path1", "path2"], "host", "token")
+        paths = ["path1", "path2", "path3"]
+        result = publish_dependencies(paths, "host", "token")
 
-        mock_publish.assert_called()
+        self.assertEqual(result, ["Success"] * len(paths))
+        self.assertEqual(mock_publish.call_count, len(paths))
+        published = sorted(c.args[2] for c in mock_publish.call_args_list)
+        self.assertEqual(published, paths)
 
 
 if __name__ == "__main__":
@@ -1,29 +1,210 @@
 import unittest
-from unittest.mock import patch, mock_open, MagicMock
+from unittest.mock import patch
+import io
 import json
+import os
+import stat
+import tempfile
 from ib_cicd.promote_build_solution import (
     download_file,
+    load_from_file,
+    rebuild_project,
     save_to_file,
 )
+from tests.fixtures import FakeResponse
 
 
 class TestPromoteBuildSolution(unittest.TestCase):
+    def _chdir_to_tmp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(tmp_dir.name)
+        return tmp_dir.name
+
     @patch("ib_cicd.promote_build_solution.read_file_through_api")
-    @patch("builtins.open", new_callable=mock_open)
-    def test_download_file(self, mock_file, mock_api):
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.content = json.dumps({"key": "value"}).encode("utf-8")
-        mock_api.return_value = mock_response
+    def test_download_file(self, mock_api):
+        self._chdir_to_tmp()
+        mock_api.return_value = FakeResponse(200, b'{"key": "value"}')
 
         result = download_file("http://example.com", "token", "solution/path")
         self.assertEqual(json.loads(result), {"key": "value"})
-        mock_file.assert_called_once_with("path", "w")
+        with open("path") as f:
+            self.assertEqual(json.load(f), {"key": "value"})
+
+    def test_save_to_stream(self):
+        buf = io.StringIO()
+        save_to_file({"key": "value"}, buf)
+        self.assertEqual(json.loads(buf.getvalue()), {"key": "value"})
+
+    def test_save_to_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, "test.json")
+            save_to_file({"key": "value"}, file_name)
+            with open(file_name) as f:
+                self.assertEqual(json.load(f), {"key": "value"})
+            self.assertEqual(os.listdir(tmp_dir), ["test.json"])
+
+    def test_save_to_file_keeps_permissions(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            new_file = os.path.join(tmp_dir, "new.json")
+            save_to_file({"key": "value"}, new_file)
+            self.assertEqual(stat.S_IMODE(os.stat(new_file).st_mode), 0o644)
+
+            existing_file = os.path.join(tmp_dir, "config.json")
+            with open(existing_file, "w") as f:
+                json.dump({}, f)
+            os.chmod(existing_file, 0o664)
+            save_to_file({"key": "value"}, existing_file)
+            self.assertEqual(stat.S_IMODE(os.stat(existing_file).st_mode), 0o664)
+
+    def test_load_from_file_sees_external_changes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, "test.json")
+            save_to_file({"key": "value"}, file_name)
+            self.assertEqual(load_from_file(file_name), {"key": "value"})
+
+            with open(file_name, "w") as f:
+                json.dump({"key": "changed", "extra": True}, f)
+            self.assertEqual(
+                load_from_file(file_name), {"key": "changed", "extra": True}
+            )
+
+    def test_loaded_data_is_not_shared(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, "test.json")
+            data = {"nested": {"key": "value"}}
+            save_to_file(data, file_name)
+            data["nested"]["key"] = "edited after save"
+
+            loaded = load_from_file(file_name)
+            self.assertEqual(loaded, {"nested": {"key": "value"}})
+            loaded["nested"]["key"] = "edited after load"
+            self.assertEqual(load_from_file(file_name), {"nested": {"key": "value"}})
+
+    def _write_fetched_project(self, schema, validations, udfs):
+        save_to_file({"projects": []}, "fetched_settings.json")
+        save_to_file(udfs, "fetched_udfs.json")
+        save_to_file(schema, "fetched_schema.json")
+        save_to_file(validations, "fetched_validations.json")
+
+    @patch("ib_cicd.promote_build_solution.post_validations")
+    @patch("ib_cicd.promote_build_solution.get_validations")
+    @patch("ib_cicd.promote_build_solution.post_schema")
+    @patch("ib_cicd.promote_build_solution.get_schema")
+    @patch("ib_cicd.promote_build_solution.post_settings")
+    def test_rebuild_project_schema_sync_marker(
+        self,
+        mock_post_settings,
+        mock_get_schema,
+        mock_post_schema,
+        mock_get_validations,
+        mock_post_validations,
+    ):
+        tmp_dir = self._chdir_to_tmp()
+        self._write_fetched_project(
+            schema={
+                "1": {
+                    "name": "class1",
+                    "description": "",
+                    "fields": {"2": {"name": "field1", "lines": []}},
+                }
+            },
+            validations={"rules": []},
+            udfs={},
+        )
+        target_schema = {"7": {"name": "class1", "fields": {"8": {"name": "field1"}}}}
+        mock_get_schema.return_value = target_schema
+        mock_get_validations.return_value = {"rules": []}
+        config = {
+            "source": {"project_id": "source_id"},
+            "target": {"project_id": "target_id", "org": "org", "workspace": "ws"},
+        }
+        env = {
+            "TARGET_TOKEN": "token",
+            "TARGET_HOST_URL": "https://target.example.com",
+            "IB_CICD_CACHE_DIR": tmp_dir,
+        }
+
+        with (
+            patch.dict(os.environ, env),
+            patch(
+                "ib_cicd.promote_build_solution.map_field_ids", return_value={}
+            ) as mock_map,
+        ):
+            rebuild_project(config)
+            self.assertEqual(mock_post_schema.call_count, 1)
+            posted_mapping_input = mock_map.call_args.args[1]
+
+            rebuild_project(config)
+            self.assertEqual(mock_post_schema.call_count, 1)
+            skipped_mapping_input = mock_map.call_args.args[1]
+
+            rebuild_project(config, force_schema_sync=True)
+            self.assertEqual(mock_post_schema.call_count, 2)
+
+        self.assertEqual(posted_mapping_input, target_schema)
+        self.assertEqual(skipped_mapping_input, target_schema)
+
+    @patch("ib_cicd.rebuild_utils._SESSION.put")
+    @patch("ib_cicd.rebuild_utils.post_udfs_batch", return_value=None)
+    @patch("ib_cicd.rebuild_utils.post_udf")
+    @patch("ib_cicd.promote_build_solution.post_validations")
+    @patch("ib_cicd.promote_build_solution.get_validations")
+    @patch("ib_cicd.promote_build_solution.post_schema")
+    @patch("ib_cicd.promote_build_solution.get_schema")
+    @patch("ib_cicd.promote_build_solution.post_settings")
+    def test_rebuild_project_posts_shared_udf_once(
+        self,
+        mock_post_settings,
+        mock_get_schema,
+        mock_post_schema,
+        mock_get_validations,
+        mock_post_validations,
+        mock_post_udf,
+        mock_post_udfs_batch,
+        mock_put,
+    ):
+        tmp_dir = self._chdir_to_tmp()
+        self._write_fetched_project(
+            schema={
+                "1": {
+                    "name": "class1",
+                    "description": "",
+                    "fields": {
+                        "1": {
+                            "name": "field1",
+                            "lines": [{"line_type": "UDF", "function_id": 1}],
+                        }
+                    },
+                }
+            },
+            validations={
+                "rules": [{"name": "rule", "type": "UDF", "params": {"udf_id": 1}}]
+            },
+            udfs={"1": {"udf": "shared"}},
+        )
+        mock_get_schema.return_value = {}
+        mock_get_validations.return_value = {"rules": []}
+        mock_post_validations.return_value = {"id": "v1"}
+        mock_post_udf.return_value = {"udf_id": "10"}
+        config = {
+            "source": {"project_id": "source_id"},
+            "target": {"project_id": "target_id", "org": "org", "workspace": "ws"},
+        }
+        env = {
+            "TARGET_TOKEN": "token",
+            "TARGET_HOST_URL": "https://target.example.com",
+            "IB_CICD_CACHE_DIR": tmp_dir,
+        }
+
+        with patch.dict(os.environ, env):
+            rebuild_project(config)
 
-    @patch("builtins.open", new_callable=mock_open)
-    def test_save_to_file(self, mock_file):
-        save_to_file({"key": "value"}, "test.json")
-        mock_file.assert_called_once_with("test.json", "w")
+        mock_post_udf.assert_called_once()
+        self.assertEqual(mock_post_udf.call_args.args[3]["udf"], "shared")
+        validation = mock_post_validations.call_args.args[3]
+        self.assertEqual(validation["params"]["udf_id"], 10)
 
 
 if __name__ == "__main__":
@@ -1,33 +1,80 @@
+import io
 import unittest
-from unittest.mock import patch, mock_open
+from unittest.mock import call, patch
 import os
-import shutil
-import logging
+import tempfile
+import zipfile
 from ib_cicd.promote_solution import (
+    NO_JOB_ID_WAIT,
     copy_solution_to_working_dir,
     upload_zip_to_instabase,
     version_tuple,
     get_latest_binary_path,
     parse_dependencies,
+    wait_for_async_response,
 )
+from tests.fixtures import FakeResponse
 
 
 class TestPromoteSolution(unittest.TestCase):
     @patch("ib_cicd.promote_solution.copy_file_within_ib")
     def test_copy_solution_to_working_dir(self, mock_copy):
-        copy_solution_to_working_dir("host", "token", "/source", "flow/path", "/new")
-        self.assertEqual(mock_copy.call_count, 2)
+        copy_solution_to_working_dir(
+            "host", "token", "/source", "flow/app.ibflow", "/new"
+        )
+        self.assertEqual(
+            [c.args[2:] for c in mock_copy.call_args_list],
+            [
+                ("/source/flow/app.ibflow", "/new/flow/app.ibflow"),
+                ("/source/flow/modules", "/new/flow/modules"),
+            ],
+        )
+
+    @patch("ib_cicd.promote_solution.time.sleep")
+    @patch("ib_cicd.promote_solution.wait_for_completion")
+    def test_wait_for_async_response_polls_job(self, mock_wait, mock_sleep):
+        wait_for_async_response(
+            "host", "token", FakeResponse(json_data={"job_id": "j1"})
+        )
+        mock_wait.assert_called_once_with("host", "token", "j1")
+        mock_sleep.assert_not_called()
+
+    @patch("ib_cicd.promote_solution.time.sleep")
+    @patch("ib_cicd.promote_solution.wait_for_completion")
+    def test_wait_for_async_response_without_job_id(self, mock_wait, mock_sleep):
+        for response in (FakeResponse(json_data={}), FakeResponse(content=b"not json")):
+            wait_for_async_response("host", "token", response)
+        mock_wait.assert_not_called()
+        self.assertEqual(
+            mock_sleep.call_args_list, [call(NO_JOB_ID_WAIT), call(NO_JOB_ID_WAIT)]
+        )
 
     @patch("ib_cicd.promote_solution.upload_file")
-    @patch("builtins.open", new_callable=mock_open, read_data=b"data")
-    @patch("shutil.make_archive")
-    def test_upload_zip_to_instabase(self, mock_archive, mock_open, mock_upload):
-        mock_upload.return_value = "Success"
-        result = upload_zip_to_instabase("/target", "host", "token", "solution")
-        mock_archive.assert_called_once()
-        mock_open.assert_called_once_with("solution.zip", "rb")
+    def test_upload_zip_to_instabase(self, mock_upload):
+        uploaded = {}
+
+        def capture_upload(host, token, path, data):
+            uploaded[path] = zipfile.ZipFile(io.BytesIO(data.read())).namelist()
+            return "Success"
+
+        mock_upload.side_effect = capture_upload
+        with tempfile.TemporaryDirectory() as source_dir:
+            os.makedirs(os.path.join(source_dir, "modules"))
+            with open(os.path.join(source_dir, "flow.ibflow"), "w") as f:
+                f.write("flow")
+            with open(os.path.join(source_dir, "modules", "udf.py"), "w") as f:
+                f.write("udf")
+
+            result = upload_zip_to_instabase(
+                "/target", "host", "token", "solution", source_dir
+            )
+
         mock_upload.assert_called_once()
         self.assertEqual(result, "Success")
+        self.assertEqual(
+            sorted(uploaded["/target/solution.zip"]),
+            ["flow.ibflow", "modules/", "modules/udf.py"],
+        )
 
     def test_version_tuple(self):
         self.assertEqual(version_tuple("1.2.3"), (1, 2, 3))
@@ -39,6 +86,12 @@ class TestPromoteSolution(unittest.TestCase):
         result = get_latest_binary_path("token", "host", "/solution")
         self.assertEqual(result, "/path/2.0.0.ibflowbin")
 
+    @patch("ib_cicd.promote_solution.list_directory")
+    def test_get_latest_binary_path_single_binary(self, mock_list):
+        mock_list.return_value = ["/path/solution.ibflowbin", "/path/flow.ibflow"]
+        result = get_latest_binary_path("token", "host", "/solution")
+        self.assertEqual(result, "/path/solution.ibflowbin")
+
     def test_parse_dependencies(self):
         self.assertEqual(
             parse_dependencies(["pkg1==1.0", "pkg2==2.1"]),
@@ -46,6 +99,9 @@ class TestPromoteSolution(unittest.TestCase):
         )
         self.assertEqual(parse_dependencies([]), {})
         self.assertEqual(parse_dependencies(["invalid"]), {})
+        self.assertEqual(
+            parse_dependencies([" pkg1 == 1.0 ", "pkg2==", "a==b==c"]), {"pkg1": "1.0"}
+        )
 
 
 if __name__ == "__main__":
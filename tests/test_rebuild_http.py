@@ -0,0 +1,433 @@
+import copy
+import re
+from unittest.mock import ANY
+
+import pytest
+import requests
+
+from ib_cicd import rebuild_utils
+from tests.fixtures import HeadersWith
+
+# (project_id, token, host_url) shared by the calls under test
+BASE = ("project_id", "token", "http://example.com")
+PROJECTS_URL = "http://example.com/api/v2/aihub/build/projects"
+
+
+# Target project schema with one class and field; the source has the same names
+# under different ids
+_SCHEMA_BASE = {
+    "1": {
+        "name": "test1",
+        "description": "A test class",
+        "fields": {"1": {"name": "field1", "lines": []}},
+    }
+}
+# Validation rule "test" as it exists on the target, and as the source defines it
+_TARGET_VALIDATIONS_BASE = {"rules": [{"name": "test", "id": "1"}]}
+_SOURCE_VALIDATIONS_BASE = {
+    "rules": [{"name": "test", "type": "UDF", "params": {"udf_id": "1"}}]
+}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_response_cache():
+    rebuild_utils.invalidate_response_cache()
+
+
+@pytest.fixture
+def target_schema():
+    """Fresh copy of the baseline schema, safe to mutate."""
+    return copy.deepcopy(_SCHEMA_BASE)
+
+
+@pytest.fixture
+def source_schema():
+    """The baseline schema re-keyed under class and field id "2"."""
+    schema_class = copy.deepcopy(_SCHEMA_BASE["1"])
+    schema_class["fields"] = {"2": schema_class["fields"]["1"]}
+    return {"2": schema_class}
+
+
+@pytest.fixture
+def target_validations():
+    """Fresh copy of the target's validations."""
+    return copy.deepcopy(_TARGET_VALIDATIONS_BASE)
+
+
+@pytest.fixture
+def source_validations():
+    """Fresh copy of the source's validations."""
+    return copy.deepcopy(_SOURCE_VALIDATIONS_BASE)
+
+
+def test_create_build_project(mocker, make_response):
+    mock_post = mocker.patch("ib_cicd.rebuild_utils._SESSION.post")
+    mock_post.return_value = make_response(json={"id": "123"})
+
+    result = rebuild_utils.create_build_project(
+        "test_project", "token", "http://example.com", "org", "workspace"
+    )
+    assert result == {"id": "123"}
+    mock_post.assert_called_once_with(
+        url=PROJECTS_URL,
+        headers=HeadersWith(Authorization="Bearer token", **{"Ib-Context": "org"}),
+        json=ANY,
+        proxies=None,
+    )
+
+
+@pytest.mark.parametrize(
+    "name, verb, path, payload, expected",
+    [
+        ("get_settings", "GET", "?proj_id=project_id", None, {"settings": "test"}),
+        ("get_udfs", "GET", "/project_id/udfs", None, {"udfs": "test"}),
+        ("get_schema", "GET", "/project_id/schema", None, {"schema": "test"}),
+        (
+            "get_validations",
+            "GET",
+            "/project_id/validations",
+            None,
+            {"validations": "test"},
+        ),
+        ("post_udf", "POST", "/project_id/udfs", {"udf": "test"}, {"udf_id": "123"}),
+        (
+            "post_schema",
+            "POST",
+            "/project_id/schema",
+            {"schema": "test"},
+            {"schema_id": "123"},
+        ),
+        (
+            "post_validations",
+            "POST",
+            "/project_id/validations",
+            {"validation": "test"},
+            {"validation_id": "123"},
+        ),
+    ],
+)
+def test_json_endpoint(rmock, name, verb, path, payload, expected):
+    rmock.register_uri(verb, PROJECTS_URL + path, json=expected)
+    args = list(BASE)
+    if payload is not None:
+        args.append(payload)
+
+    assert getattr(rebuild_utils, name)(*args) == expected
+    assert rmock.call_count == 1
+    request = rmock.last_request
+    assert request.headers["Authorization"] == "Bearer token"
+    assert "IB-Certificate" in request.headers
+    if payload is not None:
+        assert request.json() == payload
+
+
+def test_post_settings(rmock):
+    rmock.patch(f"{PROJECTS_URL}?project_id=project_id", text="success")
+
+    result = rebuild_utils.post_settings(*BASE, {"setting": "value"})
+    assert result == "success"
+    assert rmock.call_count == 1
+    assert rmock.last_request.json() == {"setting": "value"}
+
+
+def test_post_udfs_batch(mocker, make_response):
+    mock_post = mocker.patch("ib_cicd.rebuild_utils._SESSION.post")
+    mock_post.return_value = make_response(json={"udf_ids": {"1": "10", "2": "20"}})
+
+    udfs = {"1": {"udf": "a"}, "2": {"udf": "b"}}
+    result = rebuild_utils.post_udfs_batch(
+        "project_id", "token", "http://batch.example", udfs
+    )
+    assert result == {"1": "10", "2": "20"}
+    mock_post.assert_called_once_with(
+        url="http://batch.example/api/v2/aihub/build/projects/project_id/udfs:batch",
+        headers=HeadersWith(Authorization="Bearer token"),
+        json={"udfs": udfs},
+        proxies=None,
+    )
+
+
+@pytest.mark.parametrize(
+    "batch_response",
+    [
+        {"status_code": 404},
+        {"status_code": 405},
+        {"status_code": 501},
+        {"status_code": 200, "text": "<html></html>"},
+        {"status_code": 200, "json": {"ids": []}},
+    ],
+)
+def test_post_udfs_falls_back_without_batch_endpoint(mocker, rmock, batch_response):
+    batch = rmock.post(
+        "http://single.example/api/v2/aihub/build/projects/project_id/udfs:batch",
+        **batch_response,
+    )
+    mock_post_udf = mocker.patch("ib_cicd.rebuild_utils.post_udf", autospec=True)
+    mocker.patch.object(rebuild_utils, "_BATCH_UNSUPPORTED_HOSTS", set())
+    mock_post_udf.side_effect = lambda p, t, u, data, proxies=None: {
+        "udf_id": f"new_{data['udf']}"
+    }
+
+    udfs = {"1": {"udf": "a"}, "2": {"udf": "b"}}
+    for _ in range(2):
+        result = rebuild_utils.post_udfs(
+            "project_id", "token", "http://single.example", udfs
+        )
+        assert result == {"1": "new_a", "2": "new_b"}
+    # The missing batch endpoint is only probed once per host
+    assert batch.call_count == 1
+    assert mock_post_udf.call_count == 4
+
+
+@pytest.mark.parametrize("status_code", [400, 429, 500, 503])
+def test_post_udfs_batch_raises_on_other_errors(mocker, rmock, status_code):
+    rmock.post(
+        "http://flaky.example/api/v2/aihub/build/projects/project_id/udfs:batch",
+        status_code=status_code,
+    )
+    mock_post_udf = mocker.patch("ib_cicd.rebuild_utils.post_udf", autospec=True)
+    mocker.patch.object(rebuild_utils, "_BATCH_UNSUPPORTED_HOSTS", set())
+
+    with pytest.raises(requests.HTTPError):
+        rebuild_utils.post_udfs(
+            "project_id", "token", "http://flaky.example", {"1": {"udf": "a"}}
+        )
+    # A failed batch may have been partially applied, so nothing is re-posted
+    mock_post_udf.assert_not_called()
+    assert not rebuild_utils._BATCH_UNSUPPORTED_HOSTS
+
+
+def test_generate_id(mocker):
+    token_hex = mocker.patch(
+        "ib_cicd.rebuild_utils.secrets.token_hex",
+        return_value="0123456789abcdef012345",
+    )
+    assert rebuild_utils.generate_id() == "0123456789abcdef01234"
+    token_hex.assert_called_once_with(11)
+
+
+def test_get_schema_is_cached_until_schema_is_posted(rmock):
+    get = rmock.get(f"{PROJECTS_URL}/project_id/schema", json={"schema": "test"})
+    rmock.post(f"{PROJECTS_URL}/project_id/schema", json={})
+
+    for _ in range(2):
+        result = rebuild_utils.get_schema(*BASE)
+        assert result == {"schema": "test"}
+    assert get.call_count == 1
+
+    rebuild_utils.post_schema(*BASE, {"schema": "new"})
+    rebuild_utils.get_schema(*BASE)
+    assert get.call_count == 2
+
+
+def test_cached_validations_survive_modify_validations(mocker, make_response, rmock):
+    source = {
+        "rules": [
+            {"name": "udf", "type": "UDF", "params": {"udf_id": "1"}},
+            {
+                "name": "confidence",
+                "type": "CLASS_CONFIDENCE",
+                "params": {"affected_classes": ["1"]},
+            },
+        ]
+    }
+    get = rmock.get(f"{PROJECTS_URL}/project_id/validations", json=source)
+    rmock.put(
+        re.compile(f"{PROJECTS_URL}/project_id/validations/[^/]+/examples"), text="ok"
+    )
+    mocker.patch(
+        "ib_cicd.rebuild_utils.post_udf", autospec=True, return_value={"udf_id": "123"}
+    )
+    mocker.patch(
+        "ib_cicd.rebuild_utils.post_udfs_batch", autospec=True, return_value=None
+    )
+
+    rebuild_utils.modify_validations(
+        {"rules": []},
+        rebuild_utils.get_validations(*BASE),
+        *BASE,
+        {"1": {"udf": "test"}},
+        {"1": "10"},
+    )
+    assert rebuild_utils.get_validations(*BASE) == source
+    assert get.call_count == 1
+
+
+def test_get_schema_without_orjson(mocker, rmock):
+    mocker.patch("ib_cicd.rebuild_utils.orjson", None)
+    rmock.get(f"{PROJECTS_URL}/project_id/schema", json={"schema": "test"})
+
+    result = rebuild_utils.get_schema(*BASE)
+    assert result == {"schema": "test"}
+
+
+def test_modify_schema(target_schema, source_schema):
+    result = rebuild_utils.modify_schema(target_schema, source_schema, *BASE, {})
+    assert result == {
+        "classes": {"1": {**_SCHEMA_BASE["1"], "new_fields": []}},
+        "new_classes": [],
+    }
+
+
+def test_modify_schema_posts_udfs_of_all_fields(mocker):
+    mock_post_udf = mocker.patch("ib_cicd.rebuild_utils.post_udf", autospec=True)
+    mocker.patch(
+        "ib_cicd.rebuild_utils.post_udfs_batch", autospec=True, return_value=None
+    )
+    mock_post_udf.side_effect = lambda p, t, u, data, proxies=None: {
+        "udf_id": f"new_{data['udf']}"
+    }
+    source_schema = {
+        "1": {
+            "name": "class1",
+            "description": "",
+            "fields": {
+                "1": {
+                    "name": "field1",
+                    "lines": [{"line_type": "UDF", "function_id": 1}],
+                },
+                "2": {
+                    "name": "field2",
+                    "lines": [
+                        {"line_type": "PROMPT", "function_id": None},
+                        {"line_type": "UDF", "function_id": 2},
+                    ],
+                },
+                "3": {
+                    "name": "field3",
+                    "lines": [{"line_type": "UDF", "function_id": 1}],
+                },
+            },
+        }
+    }
+    udfs = {"1": {"udf": "a"}, "2": {"udf": "b"}}
+    result = rebuild_utils.modify_schema({}, source_schema, *BASE, udfs)
+    new_fields = result["new_classes"][0]["new_fields"]
+    assert mock_post_udf.call_count == 2
+    assert new_fields[0]["lines"][0]["function_id"] == "new_a"
+    assert new_fields[1]["lines"][0]["function_id"] is None
+    assert new_fields[1]["lines"][1]["function_id"] == "new_b"
+    assert new_fields[2]["lines"][0]["function_id"] == "new_a"
+    assert source_schema["1"]["fields"]["1"]["lines"][0]["function_id"] == 1
+
+
+def test_schema_sync_marker(tmp_path, monkeypatch):
+    schema = {"1": {"name": "class1", "fields": {}}}
+    udfs = {"1": {"udf": "test"}}
+    monkeypatch.setenv("IB_CICD_CACHE_DIR", str(tmp_path))
+    assert not rebuild_utils.is_schema_synced(schema, udfs, "p1", "http://a")
+    rebuild_utils.record_schema_sync(schema, udfs, "p1", "http://a")
+    assert rebuild_utils.is_schema_synced(schema, udfs, "p1", "http://a")
+    assert not rebuild_utils.is_schema_synced(schema, udfs, "p1", "http://b")
+    assert not rebuild_utils.is_schema_synced(schema, udfs, "p2", "http://a")
+    assert not rebuild_utils.is_schema_synced(schema, {}, "p1", "http://a")
+
+
+def test_delete_validations(rmock):
+    rmock.delete(f"{PROJECTS_URL}/project_id/validations?id=1")
+
+    result = rebuild_utils.delete_validations(*BASE, "1")
+    assert result.status_code == 200
+    assert rmock.call_count == 1
+    assert rmock.last_request.headers["Authorization"] == "Bearer token"
+    assert "IB-Certificate" in rmock.last_request.headers
+
+
+def test_run_prompt_udf_retries_code_generation(mocker, rmock):
+    mock_sleep = mocker.patch("time.sleep", return_value=None)
+    base_url = f"{PROJECTS_URL}/project_id/validations/7"
+    rmock.put(f"{base_url}/examples")
+    rmock.put(
+        f"{base_url}/code-generation",
+        [
+            {"status_code": 404},
+            {"exc": requests.exceptions.ConnectTimeout},
+            {"json": {"code": "generated"}},
+        ],
+    )
+
+    result = rebuild_utils.run_prompt_udf(*BASE, "7")
+    assert result == {"code": "generated"}
+    assert [r.path.rsplit("/", 1)[1] for r in rmock.request_history] == [
+        "examples",
+        "code-generation",
+        "code-generation",
+        "code-generation",
+    ]
+    settle = rebuild_utils.PROMPT_UDF_SETTLE_WAIT
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [settle, 0.2, 0.4, settle]
+    # Each attempt is bounded by what is left of the timeout
+    assert all(0 < r.timeout <= 30 for r in rmock.request_history[1:])
+
+
+def test_run_prompt_udf_gives_up_at_timeout(mocker, rmock):
+    mocker.patch("time.sleep", return_value=None)
+    mocker.patch("time.monotonic", side_effect=[0.0, 0.0, 0.1, 1.0, 1.0])
+    base_url = f"{PROJECTS_URL}/project_id/validations/7"
+    rmock.put(f"{base_url}/examples")
+    code_generation = rmock.put(f"{base_url}/code-generation", status_code=503)
+
+    with pytest.raises(requests.HTTPError):
+        rebuild_utils.run_prompt_udf(*BASE, "7", timeout=1)
+    assert code_generation.call_count == 2
+
+
+def test_modify_validations(
+    mocker, make_response, rmock, target_validations, source_validations
+):
+    mock_delete_validations = mocker.patch(
+        "ib_cicd.rebuild_utils.delete_validations", autospec=True
+    )
+    mock_post_udf = mocker.patch(
+        "ib_cicd.rebuild_utils.post_udf", autospec=True, return_value={"udf_id": "123"}
+    )
+    examples = rmock.put(
+        re.compile(f"{PROJECTS_URL}/project_id/validations/[^/]+/examples"),
+        text="ok",
+    )
+    mocker.patch(
+        "ib_cicd.rebuild_utils.post_udfs_batch", autospec=True, return_value=None
+    )
+    mock_delete_validations.return_value = make_response()
+
+    udfs = {"1": {"udf": "test"}}
+    mappings = {"1": "10"}
+    result = rebuild_utils.modify_validations(
+        target_validations,
+        source_validations,
+        *BASE,
+        udfs,
+        mappings,
+    )
+    assert isinstance(result, list)
+    assert examples.call_count == 1
+    mock_post_udf.assert_called_once()
+    mock_delete_validations.assert_called_once()
+    assert result[0]["params"]["udf_id"] == 123
+
+
+def test_modify_validations_runs_examples_of_cached_udfs(
+    mocker, make_response, rmock, target_validations, source_validations
+):
+    mocker.patch(
+        "ib_cicd.rebuild_utils.delete_validations",
+        autospec=True,
+        return_value=make_response(),
+    )
+    mock_post_udfs = mocker.patch("ib_cicd.rebuild_utils.post_udfs", autospec=True)
+    mock_post_udfs.return_value = {}
+    examples = rmock.put(
+        f"{PROJECTS_URL}/project_id/validations/55/examples", text="ok"
+    )
+
+    result = rebuild_utils.modify_validations(
+        target_validations,
+        source_validations,
+        *BASE,
+        {"1": {"udf": "test"}},
+        {"1": "10"},
+        udf_cache={"1": "55"},
+    )
+    assert mock_post_udfs.call_args.args[3] == {}
+    assert examples.call_count == 1
+    assert result[0]["params"]["udf_id"] == 55
@@ -0,0 +1,140 @@
+import copy
+
+import pytest
+
+from ib_cicd import rebuild_utils
+
+# UDF as returned by the API, including the fields the helpers strip out
+_UDF_TEMPLATE = {
+    "id": "1",
+    "name": "test",
+    "docstring": "test",
+    "last_updated_at": "2023-01-01",
+    "lambda_id": "123",
+    "lambda_udf_id": "456",
+    "lambda_end_of_life": "2024-01-01",
+}
+
+
+@pytest.fixture
+def function_data():
+    """Fresh copy of the UDF template, safe to mutate in place."""
+    return copy.deepcopy(_UDF_TEMPLATE)
+
+
+@pytest.fixture
+def payload():
+    """UDFs response keyed by function id, built from the template."""
+    return {"1": copy.deepcopy(_UDF_TEMPLATE)}
+
+
+def test_headers_are_reused():
+    headers = rebuild_utils._headers("token", "org")
+    assert rebuild_utils._headers("token", "org") is headers
+    assert headers["Authorization"] == "Bearer token"
+    assert headers["Ib-Context"] == "org"
+    assert "Ib-Context" not in rebuild_utils._headers("token")
+
+
+def test_clean_udf_function_data(function_data):
+    rebuild_utils.clean_udf_function_data(function_data)
+    assert function_data == {"id": "1", "name": "test", "return_type": "string"}
+
+
+def test_modify_settings():
+    response = {
+        "projects": [
+            {"id": "other_id", "name": "other", "desc": "other", "llm": "x"},
+            {"id": "project_id", "name": "test", "desc": "test", "llm": ""},
+        ]
+    }
+    assert rebuild_utils.modify_settings("missing_id", response) == {}
+    result = rebuild_utils.modify_settings("project_id", response)
+    assert result == {"desc": "test", "llm": ""}
+
+
+def test_clean_settings_function_data():
+    settings = {
+        "id": "1",
+        "name": "project",
+        "project_root": "root",
+        "data_root": "data",
+        "workspace": "ws",
+        "llm": "",
+    }
+    rebuild_utils.clean_settings_function_data(settings)
+    assert settings == {"llm": ""}
+
+
+def test_sanitize_udf_payload(payload):
+    result = rebuild_utils.sanitize_udf_payload(payload)
+    assert result == {"1": {"id": "1", "name": "test", "return_type": "string"}}
+    assert payload == {"1": _UDF_TEMPLATE}
+
+
+def test_get_item_ids():
+    schema = {
+        "1": {"name": "test1"},
+        "2": {"name": "test2"},
+        "last_edited_at": "2023-01-01",
+    }
+    result = rebuild_utils.get_item_ids(schema)
+    assert result == {"test1": "1", "test2": "2"}
+
+    schema["3"] = {"name": "test3"}
+    assert rebuild_utils.get_item_ids(schema) == {
+        "test1": "1",
+        "test2": "2",
+        "test3": "3",
+    }
+
+
+def test_modify_udf_lines():
+    source_lines = [
+        {"line_type": "UDF", "function_id": 1},
+        {"line_type": "PROMPT", "function_id": None},
+        {"line_type": "UDF", "function_id": 1},
+    ]
+    field_schema = {"lines": source_lines}
+    rebuild_utils.modify_udf_lines(field_schema, {"1": "123"})
+    assert [line["function_id"] for line in field_schema["lines"]] == [
+        "123",
+        None,
+        "123",
+    ]
+    assert source_lines[0]["function_id"] == 1
+
+
+def test_collect_udf_ids():
+    source_schema = {
+        "1": {
+            "name": "class1",
+            "fields": {
+                "1": {"lines": [{"line_type": "UDF", "function_id": 1}]},
+                "2": {
+                    "lines": [
+                        {"line_type": "UDF", "function_id": 1},
+                        {"line_type": "UDF", "function_id": 2},
+                        {"line_type": "PROMPT", "function_id": 3},
+                    ]
+                },
+                "last_edited_at": "2023-01-01",
+            },
+        },
+        "last_edited_class_at": "2023-01-01",
+    }
+    assert rebuild_utils.collect_udf_ids(source_schema) == {"1", "2"}
+
+
+def test_update_fields_with_mapping():
+    fields = [1, 2]
+    mappings = {"1": 10, "2": 20}
+    result = rebuild_utils.update_fields_with_mapping(fields, mappings)
+    assert result == [10, 20]
+
+
+def test_map_field_ids():
+    old_schema = {"1": {"name": "test1", "fields": {"1": {"name": "field1"}}}}
+    new_schema = {"2": {"name": "test1", "fields": {"2": {"name": "field1"}}}}
+    result = rebuild_utils.map_field_ids(old_schema, new_schema)
+    assert result == {"1": "2"}